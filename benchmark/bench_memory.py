@@ -0,0 +1,121 @@
+"""
+Memory footprint of a parsed library, and of its nodes against the baseline dataclass layout.
+Usage:
+    $ python3 benchmark/bench_memory.py [file.lib]
+Without a file, a synthetic library of 500 cells is parsed.
+"""
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from liberty_sdk.parser.liberty_parser import (  # noqa: E402
+    LibertyParser, LibertyGroup, LibertyAttribute, ComplexLibertyAttribute)
+from liberty_sdk.tools.synthetic import synthetic_library  # noqa: E402
+
+
+# Node classes as of the baseline, dataclasses with eager containers, for comparison
+@dataclass
+class BaselineAttribute:
+    name: str
+    value: str
+
+
+@dataclass
+class BaselineComplexAttribute:
+    name: str
+    params: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BaselineGroup:
+    group_type: str
+    name: str
+    params: Dict[str, str] = field(default_factory=dict)
+    children: list = field(default_factory=list)
+
+
+def current_group(group_type, name, params, children):
+    # Empty containers are left to be allocated on first access, as the parser does
+    return LibertyGroup(group_type, name, params or None, children or None)
+
+
+LAYOUTS = {
+    'current': (current_group, LibertyAttribute, ComplexLibertyAttribute),
+    'baseline': (BaselineGroup, BaselineAttribute, BaselineComplexAttribute),
+}
+
+
+def count_nodes(root: LibertyGroup) -> int:
+    count, stack = 0, [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, LibertyGroup):
+            stack.extend(node._children or ())
+    return count
+
+
+def copy_tree(root: LibertyGroup, group, attribute, complex_attribute):
+    """Copy of the tree built by the given node classes, bottom-up so groups get their children complete"""
+    stack = [(root, iter(root._children or ()), [])]
+    while True:
+        node, children, copies = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            copy = group(node.group_type, node.name, dict(node._params or {}), copies)
+            if not stack:
+                return copy
+            stack[-1][2].append(copy)
+        elif isinstance(child, LibertyGroup):
+            stack.append((child, iter(child._children or ()), []))
+        elif isinstance(child, ComplexLibertyAttribute):
+            copies.append(complex_attribute(child.name, list(child.params)))
+        else:
+            copies.append(attribute(child.name, child.value))
+
+
+def layout_bytes(root: LibertyGroup, layout) -> int:
+    """Bytes retained by a copy of the tree in a layout. Strings are shared with root, so only nodes count."""
+    tracemalloc.start()
+    copy = copy_tree(root, *LAYOUTS[layout])
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copy
+    return retained
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            text = f.read()
+    else:
+        text = synthetic_library(cells=500).encode()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    root = LibertyParser.from_string(text).parse()
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(root)
+    print(f"Input:     {len(text) / 1e6:.2f} MB, {nodes} nodes")
+    print(f"Parse:     {elapsed:.2f}s (traced)")
+    print(f"Retained:  {retained / 1e6:.2f} MB, {retained / nodes:.0f} B/node")
+    print(f"Peak:      {peak / 1e6:.2f} MB")
+
+    # Same tree in both layouts, strings excluded
+    sizes = {layout: layout_bytes(root, layout) for layout in LAYOUTS}
+    for layout, size in sizes.items():
+        print(f"{layout.capitalize() + ':':<11}{size / 1e6:.2f} MB, {size / nodes:.0f} B/node, nodes only")
+    print(f"Saved:     {1 - sizes['current'] / sizes['baseline']:.0%} of baseline node memory")
+
+
+if __name__ == '__main__':
+    main()
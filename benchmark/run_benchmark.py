@@ -0,0 +1,156 @@
+"""
+Parser benchmark over synthetic libraries of growing size.
+Usage:
+    $ python3 benchmark/run_benchmark.py --cells 100 1000 10000 -o bench.json
+    $ python3 benchmark/run_benchmark.py --cells 100 1000 10000 --baseline bench.json
+Each size runs in a fresh process, so peak RSS is that of the size alone.
+Results are written as JSON, and compared stage by stage against --baseline if given.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from liberty_sdk import __version__  # noqa: E402
+from liberty_sdk.parser.liberty_parser import LibertyParser  # noqa: E402
+from liberty_sdk.parser.lazy_library import LazyLibrary  # noqa: E402
+from liberty_sdk.parser.liberty_json import dump_json  # noqa: E402
+from liberty_sdk.parser.query_cache import query_cache  # noqa: E402
+from liberty_sdk.tools.synthetic import write_synthetic_library  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ('tokenize', 'index', 'parse', 'get', 'dump', 'json')
+LOOKUPS = 1000
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return float('nan')
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 ** 2 if sys.platform == 'darwin' else rss / 1024  # Bytes on macOS, KB elsewhere
+
+
+def timed(func, repeat=1):
+    """:return: Result of the last call, best time of repeat calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_size(file_path, cells, spec, repeat=1) -> dict:
+    """Worker: benchmark one library, each stage timed as best of repeat"""
+    result = {'cells': cells, 'size_mb': os.path.getsize(file_path) / 1e6}
+
+    result['tokens'], result['tokenize'] = timed(lambda: sum(1 for _ in LibertyParser(file_path)._tokenize()),
+                                                 repeat)
+
+    def index():  # The cell scan of LazyLibrary and parse_parallel
+        with LazyLibrary(file_path) as lazy:
+            return len(lazy.cells)
+    _, result['index'] = timed(index, repeat)
+    library, result['parse'] = timed(lambda: LibertyParser(file_path).parse(), repeat)
+
+    rng = random.Random(0)
+    template = f"delay_template_{'x'.join(map(str, spec['table_size']))}"
+
+    def lookups():
+        query_cache.clear()
+        return [library.get(cell=f"CELL_{rng.randrange(cells)}", pin='Z', timing='', cell_rise=template)
+                for _ in range(LOOKUPS)]
+    _, result['get'] = timed(lookups, repeat)
+
+    with open(os.devnull, 'w') as f:
+        _, result['dump'] = timed(lambda: library.dump_to(f), repeat)
+    with open(os.devnull, 'w') as f:
+        _, result['json'] = timed(lambda: dump_json(library, f), repeat)
+
+    result['parse_mb_s'] = result['size_mb'] / result['parse'] if result['parse'] else 0.0
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def compare(results, baseline, threshold) -> int:
+    """Print change against baseline per size and stage, return number of regressions"""
+    previous = {entry['cells']: entry for entry in baseline['results']}
+    regressions = 0
+    for entry in results:
+        old = previous.get(entry['cells'])
+        if old is None:
+            continue
+        for stage in STAGES + ('peak_rss_mb',):
+            if not old.get(stage):
+                continue
+            change = entry[stage] / old[stage] - 1
+            flag = ''
+            if change > threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{entry['cells']:>8} cells  {stage:<12} {old[stage]:>10.3f} -> {entry[stage]:>10.3f} "
+                  f"({change:+.1%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cells', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--inputs', type=int, default=2)
+    parser.add_argument('--outputs', type=int, default=1)
+    parser.add_argument('--buses', type=int, default=1)
+    parser.add_argument('--bus-width', type=int, default=8)
+    parser.add_argument('--table-size', type=int, nargs='+', default=[7, 7])
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage, the best is kept")
+    parser.add_argument('-o', '--output', help="Write results JSON here")
+    parser.add_argument('--baseline', help="Results JSON of a previous run to compare with")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Slowdown reported as regression, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    spec = {'inputs': args.inputs, 'outputs': args.outputs, 'buses': args.buses,
+            'bus_width': args.bus_width, 'table_size': args.table_size, 'repeat': args.repeat}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for cells in args.cells:
+            file_path = os.path.join(tmp_dir, f"synthetic_{cells}.lib")
+            write_synthetic_library(file_path, cells=cells, inputs=args.inputs, outputs=args.outputs,
+                                    buses=args.buses, bus_width=args.bus_width, table_size=tuple(args.table_size))
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_size, file_path, cells, spec, args.repeat).result()
+            os.remove(file_path)
+            results.append(result)
+            print(f"{cells:>8} cells {result['size_mb']:>9.1f} MB  " +
+                  '  '.join(f"{stage} {result[stage]:.3f}s" for stage in STAGES) +
+                  f"  parse {result['parse_mb_s']:.1f} MB/s  peak RSS {result['peak_rss_mb']:.0f} MB")
+
+    report = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'spec': spec,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(results, baseline, args.threshold) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+import os
+import mmap
+import struct
+from collections.abc import Mapping, Sequence
+from logging import getLogger
+from typing import Union
+
+import numpy as np
+
+from .liberty_parser import LibertyGroup, ParseError
+from .columnar import ColumnarBuilder, ColumnarTree, ColumnarGroup, COLUMNS, GROUP
+
+logger = getLogger("main")
+
+# File layout, little-endian, every section aligned to 8 bytes:
+#   header: magic, version, node count, param count, float count, string count, string blob size
+#   kind: int8 per node
+#   One int32 array per node column, in the order of columnar.COLUMNS
+#   params: int32 string ids of complex attribute params
+#   floats: float64 pool of numeric values
+#   string offsets: uint64, string count + 1
+#   string blob: UTF-8 strings back to back
+# Arrays are used in place from the memory-mapped file, strings are decoded on access.
+MAGIC = b'LIBTREE\0'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sI4xQQQQQ')
+ALIGNMENT = 8
+
+
+def _align(offset) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _sections(nodes, params, floats, strings, blob_size):
+    """
+    :return: [(name, dtype, count, offset)] in file order, and file size
+    """
+    layout = [('kind', '<i1', nodes)] + [(name, '<i4', nodes) for name in COLUMNS] + [
+        ('params', '<i4', params), ('floats', '<f8', floats),
+        ('string_offsets', '<u8', strings + 1), ('blob', 'u1', blob_size),
+    ]
+    sections, offset = [], _align(HEADER.size)
+    for name, dtype, count in layout:
+        sections.append((name, dtype, count, offset))
+        offset = _align(offset + np.dtype(dtype).itemsize * count)
+    return sections, offset
+
+
+def write_binary(source: Union[LibertyGroup, ColumnarTree], file_path) -> int:
+    """
+    Write a library in the binary format, see <class 'BinaryLibrary'> to read it.
+    :param source: <class 'LibertyGroup'> tree or <class 'ColumnarTree'>
+    :return: File size in bytes
+    """
+    tree = ColumnarBuilder.from_group(source).build() if isinstance(source, LibertyGroup) else source
+    encoded = [s.encode('utf-8') for s in tree.strings]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    blob = b''.join(encoded)
+
+    arrays = {'kind': tree.kind, 'params': tree.params, 'floats': tree.floats,
+              'string_offsets': offsets, 'blob': np.frombuffer(blob, dtype='u1')}
+    arrays.update((name, getattr(tree, name)) for name in COLUMNS)
+    sections, size = _sections(len(tree), len(tree.params), len(tree.floats), len(encoded), len(blob))
+
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(tree), len(tree.params), len(tree.floats),
+                            len(encoded), len(blob)))
+        for name, dtype, count, offset in sections:
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(np.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+        f.write(b'\0' * (size - f.tell()))
+    os.replace(tmp_path, file_path)
+    logger.info(f"Wrote {len(tree)} nodes to {file_path}, {size / 1e6:.1f} MB")
+    return size
+
+
+class StringTable(Sequence):
+    """Strings of a binary file, decoded on access"""
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+
+class StringIndex(Mapping):
+    """
+    String to id lookup over a <class 'StringTable'> by searching its blob in the mapped file,
+    so a lookup by cell name doesn't decode the whole table
+    """
+    def __init__(self, table: StringTable, buffer, blob_offset):
+        self.table = table
+        self._buffer = buffer
+        self._start = blob_offset
+        self._end = blob_offset + len(table.blob)
+        self._found = {}
+
+    def __getitem__(self, s):
+        sid = self._found.get(s)
+        if sid is not None:
+            return sid
+        target = s.encode('utf-8')
+        offsets = self.table.offsets
+        if not target:
+            # Empty strings have equal start and end offsets
+            matches = np.flatnonzero(offsets[1:] == offsets[:-1])
+            if not len(matches):
+                raise KeyError(s)
+            sid = int(matches[0])
+        else:
+            found = self._buffer.find(target, self._start, self._end)
+            while True:
+                if found < 0:
+                    raise KeyError(s)
+                pos = found - self._start
+                # Last string starting at pos, empty strings before it start there too
+                i = int(np.searchsorted(offsets, pos, side='right')) - 1
+                if i < len(self.table) and offsets[i] == pos and offsets[i + 1] == pos + len(target):
+                    sid = i
+                    break
+                found = self._buffer.find(target, found + 1, self._end)
+        self._found[s] = sid
+        return sid
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+
+class BinaryLibrary:
+    """
+    Library opened from the binary format without deserializing it.
+    Node arrays map the file in place, a cell is materialized only when asked for.
+    Such as:
+        with BinaryLibrary('big.ltree') as lib:
+            pin = lib.cell('AND2').get(pin='o')  # Read-only view
+            cell = lib.cell('AND2').to_group()  # <class 'LibertyGroup'>
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.tree = self._load()
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self) -> ColumnarTree:
+        if len(self._mm) < HEADER.size:
+            raise ParseError(f"{self.file_path} is not a binary Liberty file")
+        magic, version, nodes, params, floats, strings, blob_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ParseError(f"{self.file_path} is not a binary Liberty file")
+        if version != FORMAT_VERSION:
+            raise ParseError(f"{self.file_path} is of format version {version}, expected {FORMAT_VERSION}")
+        sections, size = _sections(nodes, params, floats, strings, blob_size)
+        if len(self._mm) < size:
+            raise ParseError(f"{self.file_path} is truncated")
+
+        arrays = {name: np.frombuffer(self._mm, dtype=dtype, count=count, offset=offset)
+                  for name, dtype, count, offset in sections}
+        table = StringTable(arrays['string_offsets'], arrays['blob'])
+        return ColumnarTree(
+            kind=arrays['kind'], columns={name: arrays[name] for name in COLUMNS},
+            params=arrays['params'], floats=arrays['floats'], strings=table,
+            string_ids=StringIndex(table, self._mm, sections[-1][3]),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.tree = None
+        try:
+            self._mm.close()
+        except BufferError:
+            # Arrays taken from the tree are still alive, the map is released with them
+            logger.debug("Binary library %s is still referenced", self.file_path)
+        self._file.close()
+
+    @property
+    def root(self) -> ColumnarGroup:
+        return self.tree.root
+
+    def cell(self, name) -> ColumnarGroup:
+        tree = self.tree
+        nodes = np.flatnonzero((tree.kind == GROUP) & (tree.key == tree.string_id('cell')) &
+                               (tree.label == tree.string_id(name)))
+        if not len(nodes):
+            raise KeyError(name)
+        return tree.view(int(nodes[0]))
+
+    def get(self, *args, **kwargs):
+        """Same lookup as `LibertyGroup.get`, on read-only views"""
+        return self.root.get(*args, **kwargs)
+
+    def to_group(self) -> LibertyGroup:
+        return self.tree.to_group()
+
+
+def read_binary(file_path) -> LibertyGroup:
+    """
+    Load a whole library from the binary format as <class 'LibertyGroup'>
+    """
+    with BinaryLibrary(file_path) as library:
+        return library.to_group()
@@ -0,0 +1,452 @@
+from array import array
+from logging import getLogger
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .liberty_parser import (
+    LibertyParser, LibertyHandler, LibertyGroup, LibertyAttribute, ComplexLibertyAttribute, make_attribute,
+)
+
+logger = getLogger("main")
+
+# Node kinds
+GROUP = 0  # `cell (AND2) { ... }`
+PARAM = 1  # Simple attribute, `area : 1;`
+ATTRIBUTE = 2  # Single value complex attribute, `index_1 ("0.5, 1.0");`
+COMPLEX = 3  # Complex attribute, `voltage_map (VDD, 0.75);`
+
+# Attributes whose rows go to the float pool
+TABLE_ATTRIBUTES = frozenset(('index_1', 'index_2', 'index_3', 'values'))
+
+NO_NODE = -1
+
+# Per node columns, all int32 but kind
+COLUMNS = ('key', 'label', 'parent', 'first_child', 'next_sibling',
+           'param_start', 'param_count', 'float_start', 'float_count', 'rows')
+
+
+def _parse_row(row: str) -> Optional[List[float]]:
+    try:
+        return [float(x) for x in row.split(',')]
+    except ValueError:
+        return None
+
+
+class ColumnarBuilder(LibertyHandler):
+    """
+    Build <class 'ColumnarTree'> from parse events, one row per node in parallel arrays.
+    Nodes are numbered in file order, so a group's subtree is a contiguous range after it.
+    """
+    def __init__(self):
+        self.kind = array('b')
+        self.columns = {name: array('i') for name in COLUMNS}
+        self.params = array('i')  # String ids of complex attribute params
+        self.floats = array('d')  # Float pool
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+        self.stack: List[int] = []  # Open groups
+        self.last_child: List[int] = []  # Last child of each open group
+
+    def string_id(self, s) -> int:
+        sid = self.string_ids.get(s)
+        if sid is None:
+            sid = self.string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return sid
+
+    def _add(self, kind, key, label=NO_NODE) -> int:
+        node = len(self.kind)
+        columns = self.columns
+        self.kind.append(kind)
+        columns['key'].append(self.string_id(key))
+        columns['label'].append(label)
+        parent = self.stack[-1] if self.stack else NO_NODE
+        columns['parent'].append(parent)
+        for name in ('first_child', 'next_sibling'):
+            columns[name].append(NO_NODE)
+        for name in ('param_start', 'param_count', 'float_start', 'float_count', 'rows'):
+            columns[name].append(0)
+
+        if self.stack:
+            last = self.last_child[-1]
+            if last == NO_NODE:
+                columns['first_child'][parent] = node
+            else:
+                columns['next_sibling'][last] = node
+            self.last_child[-1] = node
+        return node
+
+    def _add_floats(self, node, values):
+        self.columns['float_start'][node] = len(self.floats)
+        self.columns['float_count'][node] = len(values)
+        self.floats.extend(values)
+
+    def start_group(self, group_type, name):
+        node = self._add(GROUP, group_type, self.string_id(name))
+        self.stack.append(node)
+        self.last_child.append(NO_NODE)
+
+    def end_group(self):
+        self.stack.pop()
+        self.last_child.pop()
+
+    def attribute(self, name, value):
+        node = self._add(PARAM, name, self.string_id(value))
+        try:
+            self._add_floats(node, [float(value)])
+        except ValueError:
+            pass
+
+    def complex_attribute(self, name, params):
+        self.add_attribute(make_attribute(name, params))
+
+    def add_attribute(self, attr):
+        """Add <class 'LibertyAttribute'> or <class 'ComplexLibertyAttribute'> under the open group"""
+        name = attr.name
+        if isinstance(attr, LibertyAttribute):
+            kind, rows = ATTRIBUTE, [attr.value]
+        else:
+            kind, rows = COMPLEX, attr.params
+        node = self._add(kind, name)
+
+        if name in TABLE_ATTRIBUTES:
+            parsed = [_parse_row(row) for row in rows]
+            if all(values is not None for values in parsed):
+                self._add_floats(node, [x for values in parsed for x in values])
+                self.columns['rows'][node] = len(rows)
+                # Row text is kept only where it can't be formatted back from floats
+                if all(', '.join(map(repr, values)) == row for values, row in zip(parsed, rows)):
+                    return
+
+        if kind == ATTRIBUTE:
+            self.columns['label'][node] = self.string_id(attr.value)
+        else:
+            self.columns['param_start'][node] = len(self.params)
+            self.columns['param_count'][node] = len(rows)
+            self.params.extend(self.string_id(row) for row in rows)
+
+    @classmethod
+    def from_group(cls, root: LibertyGroup) -> 'ColumnarBuilder':
+        """Builder filled from an existing tree, params of each group before its children"""
+        builder = cls()
+        builder.start_group(root.group_type, root.name)
+        for k, v in root.params.items():
+            builder.attribute(k, v)
+        stack = [iter(root.children)]
+        while stack:
+            for child in stack[-1]:
+                if isinstance(child, LibertyGroup):
+                    builder.start_group(child.group_type, child.name)
+                    for k, v in child.params.items():
+                        builder.attribute(k, v)
+                    stack.append(iter(child.children))
+                    break
+                builder.add_attribute(child)
+            else:
+                stack.pop()
+                builder.end_group()
+        return builder
+
+    def build(self) -> 'ColumnarTree':
+        return ColumnarTree(
+            kind=np.frombuffer(self.kind, dtype=np.int8),
+            columns={name: np.frombuffer(column, dtype=np.int32) for name, column in self.columns.items()},
+            params=np.frombuffer(self.params, dtype=np.int32),
+            floats=np.frombuffer(self.floats, dtype=np.float64),
+            strings=self.strings,
+        )
+
+
+class ColumnarTree:
+    """
+    Library stored as parallel arrays instead of a Python object per node.
+    Such as:
+        tree = parse_columnar('big.lib')
+        arcs = tree.where('timing', timing_type='setup_rising')  # Node ids of matching timing groups
+        cells = tree.labels(tree.ancestor(arcs, 'cell'))  # Their cell names
+
+    Columns, indexed by node id:
+        kind: GROUP, PARAM, ATTRIBUTE or COMPLEX
+        key: String id of group type or attribute name
+        label: String id of group name or attribute value, -1 if none
+        parent, first_child, next_sibling: Node ids, -1 if none
+        param_start, param_count: Range of COMPLEX params in `params`, as string ids
+        float_start, float_count: Range of numeric values in `floats`. Set for numeric simple attributes
+                                  and for numeric table attributes, in which case `rows` is the row count.
+    """
+    def __init__(self, kind: np.ndarray, columns: Dict[str, np.ndarray], params: np.ndarray,
+                 floats: np.ndarray, strings: Sequence[str], string_ids: Mapping[str, int] = None):
+        self.kind = kind
+        for name, column in columns.items():
+            setattr(self, name, column)
+        self.params = params
+        self.floats = floats
+        self.strings = strings  # Any sequence, such as the lazily decoded table of a binary file
+        self._string_ids = string_ids
+
+    def __len__(self):
+        return len(self.kind)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of arrays, string table excluded"""
+        return (self.kind.nbytes + sum(getattr(self, name).nbytes for name in COLUMNS) +
+                self.params.nbytes + self.floats.nbytes)
+
+    @property
+    def string_ids(self) -> Mapping[str, int]:
+        if self._string_ids is None:
+            self._string_ids = {s: i for i, s in enumerate(self.strings)}
+        return self._string_ids
+
+    def string_id(self, s) -> int:
+        """-1 if s is not in the string table"""
+        return self.string_ids.get(s, NO_NODE)
+
+    # Array scans, returning node ids in file order
+
+    def nodes(self, kind, key=None) -> np.ndarray:
+        mask = self.kind == kind
+        if key is not None:
+            mask &= self.key == self.string_id(key)
+        return np.flatnonzero(mask)
+
+    def groups(self, group_type=None) -> np.ndarray:
+        return self.nodes(GROUP, group_type)
+
+    def _value_ids(self, value):
+        # Quoted and unquoted spelling match alike, such as A and "A"
+        value = str(value)
+        spellings = (value, value[1:-1] if value.startswith('"') else f'"{value}"')
+        return [sid for sid in map(self.string_id, spellings) if sid != NO_NODE]
+
+    def where(self, group_type, **params) -> np.ndarray:
+        """
+        Groups of group_type having all simple attributes given,
+        such as `where('timing', timing_type='setup_rising', related_pin='CK')`
+        """
+        mask = (self.kind == GROUP) & (self.key == self.string_id(group_type))
+        for name, value in params.items():
+            attrs = (self.kind == PARAM) & (self.key == self.string_id(name))
+            attrs &= np.isin(self.label, self._value_ids(value))
+            has = np.zeros(len(self), dtype=bool)
+            has[self.parent[attrs]] = True
+            mask &= has
+        return np.flatnonzero(mask)
+
+    def children_of(self, nodes: np.ndarray, kind=None, key=None) -> np.ndarray:
+        """Children of any of nodes, filtered by kind and key"""
+        mask = np.isin(self.parent, nodes)
+        if kind is not None:
+            mask &= self.kind == kind
+        if key is not None:
+            mask &= self.key == self.string_id(key)
+        return np.flatnonzero(mask)
+
+    def ancestor(self, nodes: np.ndarray, group_type) -> np.ndarray:
+        """Nearest enclosing group of group_type for each of nodes, -1 if none"""
+        key = self.string_id(group_type)
+        current = self.parent[np.asarray(nodes, dtype=np.intp)]
+        result = np.full(len(current), NO_NODE, dtype=np.int32)
+        pending = current != NO_NODE
+        while pending.any():
+            found = pending & (self.key[current] == key) & (self.kind[current] == GROUP)
+            result[found] = current[found]
+            pending &= ~found
+            current = np.where(pending, self.parent[current], NO_NODE)
+            pending &= current != NO_NODE
+        return result
+
+    def attribute_of(self, nodes: np.ndarray, name, kind=PARAM) -> np.ndarray:
+        """Node id of attribute name in each of nodes, -1 if absent. The last one wins if repeated."""
+        attrs = np.flatnonzero((self.kind == kind) & (self.key == self.string_id(name)))
+        lookup = np.full(len(self), NO_NODE, dtype=np.int32)
+        lookup[self.parent[attrs]] = attrs
+        nodes = np.asarray(nodes, dtype=np.intp)
+        return np.where(nodes >= 0, lookup[nodes], NO_NODE)
+
+    def param_values(self, nodes: np.ndarray, name) -> List[Optional[str]]:
+        """Simple attribute name of each of nodes, None if absent"""
+        return [self.strings[self.label[attr]] if attr != NO_NODE else None
+                for attr in self.attribute_of(nodes, name).tolist()]
+
+    def numeric_values(self, nodes: np.ndarray, name) -> np.ndarray:
+        """Numeric simple attribute name of each of nodes, NaN if absent or not a number"""
+        attrs = self.attribute_of(nodes, name)
+        result = np.full(len(attrs), np.nan)
+        ok = attrs != NO_NODE
+        ok[ok] = self.float_count[attrs[ok]] > 0
+        result[ok] = self.floats[self.float_start[attrs[ok]]]
+        return result
+
+    def labels(self, nodes: np.ndarray) -> List[Optional[str]]:
+        """Group names of nodes"""
+        return [self.strings[self.label[node]] if node != NO_NODE else None for node in np.asarray(nodes).tolist()]
+
+    def table(self, node) -> Optional[np.ndarray]:
+        """Floats of a numeric table attribute node, one row per table row"""
+        rows = int(self.rows[node])
+        if not rows:
+            return None
+        start, count = int(self.float_start[node]), int(self.float_count[node])
+        return self.floats[start:start + count].reshape(rows, -1)
+
+    # Node access
+
+    def child_ids(self, node) -> List[int]:
+        result = []
+        child = int(self.first_child[node])
+        while child != NO_NODE:
+            result.append(child)
+            child = int(self.next_sibling[child])
+        return result
+
+    def _rows(self, node) -> List[str]:
+        count = int(self.param_count[node])
+        if count:
+            start = int(self.param_start[node])
+            return [self.strings[sid] for sid in self.params[start:start + count].tolist()]
+        table = self.table(node)
+        return [', '.join(map(repr, row)) for row in table.tolist()] if table is not None else []
+
+    def attribute(self, node):
+        """Materialize attribute node as <class 'LibertyAttribute'> or <class 'ComplexLibertyAttribute'>"""
+        name = self.strings[self.key[node]]
+        if self.kind[node] == ATTRIBUTE:
+            label = int(self.label[node])
+            return LibertyAttribute(name, self.strings[label] if label != NO_NODE else self._rows(node)[0])
+        return ComplexLibertyAttribute(name, self._rows(node))
+
+    def view(self, node=0) -> 'ColumnarGroup':
+        return ColumnarGroup(self, node)
+
+    @property
+    def root(self) -> 'ColumnarGroup':
+        return self.view(0)
+
+    def to_group(self, node=0) -> LibertyGroup:
+        """Materialize subtree of a group node as <class 'LibertyGroup'>"""
+        return self.view(node).to_group()
+
+
+class ColumnarGroup:
+    """
+    Read-only view of a group in <class 'ColumnarTree'>, with the lookup API of <class 'LibertyGroup'>.
+    params and children are materialized on access.
+    """
+    __slots__ = ('tree', 'node')
+
+    def __init__(self, tree: ColumnarTree, node: int):
+        self.tree = tree
+        self.node = node
+
+    def __repr__(self):
+        return f"ColumnarGroup({self.group_type} ({self.name}), node={self.node})"
+
+    def __eq__(self, other):
+        return isinstance(other, ColumnarGroup) and other.tree is self.tree and other.node == self.node
+
+    def __hash__(self):
+        return hash((id(self.tree), self.node))
+
+    @property
+    def group_type(self) -> str:
+        return self.tree.strings[self.tree.key[self.node]]
+
+    @property
+    def name(self) -> str:
+        return self.tree.strings[self.tree.label[self.node]]
+
+    @property
+    def params(self) -> Dict[str, str]:
+        tree = self.tree
+        return {tree.strings[tree.key[child]]: tree.strings[tree.label[child]]
+                for child in tree.child_ids(self.node) if tree.kind[child] == PARAM}
+
+    @property
+    def children(self) -> list:
+        tree = self.tree
+        return [ColumnarGroup(tree, child) if tree.kind[child] == GROUP else tree.attribute(child)
+                for child in tree.child_ids(self.node) if tree.kind[child] != PARAM]
+
+    @property
+    def parent(self) -> Optional['ColumnarGroup']:
+        parent = int(self.tree.parent[self.node])
+        return ColumnarGroup(self.tree, parent) if parent != NO_NODE else None
+
+    def match(self, k, v=None):
+        if v is not None:
+            return self.group_type == k and self.name == v
+        return self.group_type == k
+
+    def find_child(self, k, v=None):
+        """First child matching (k, v) as in `LibertyGroup.find_child()`, or None"""
+        tree = self.tree
+        for child in tree.child_ids(self.node):
+            if tree.kind[child] == PARAM or tree.strings[tree.key[child]] != k:
+                continue
+            if tree.kind[child] != GROUP:
+                return tree.attribute(child)
+            if not v or tree.strings[tree.label[child]] == v:
+                return ColumnarGroup(tree, child)
+        return None
+
+    def get(self, *args, **kwargs):
+        """Same lookup as `LibertyGroup.get()`"""
+        if args:
+            key = args[0]
+            value = self.params.get(key)
+            if value:
+                return value
+            tree = self.tree
+            value_list = [ColumnarGroup(tree, child) if tree.kind[child] == GROUP else tree.attribute(child).get()
+                          for child in tree.child_ids(self.node)
+                          if tree.kind[child] != PARAM and tree.strings[tree.key[child]] == key]
+            return value_list[0] if len(value_list) == 1 else value_list
+        if kwargs:
+            items = iter(kwargs.items())
+            k, v = next(items)
+            child = self.find_child(k, v)
+            if child is not None:
+                return child.get(**dict(items))
+        return self
+
+    def table(self, name='values') -> Optional[np.ndarray]:
+        """Floats of table attribute name, such as values or index_1"""
+        tree = self.tree
+        for child in tree.child_ids(self.node):
+            if tree.kind[child] in (ATTRIBUTE, COMPLEX) and tree.strings[tree.key[child]] == name:
+                return tree.table(child)
+        return None
+
+    def to_group(self) -> LibertyGroup:
+        """Materialize subtree as <class 'LibertyGroup'>"""
+        tree = self.tree
+        root = LibertyGroup(self.group_type, self.name)
+        stack = [(self.node, root)]
+        while stack:
+            node, group = stack.pop()
+            for child in tree.child_ids(node):
+                kind = tree.kind[child]
+                if kind == PARAM:
+                    group.params[tree.strings[tree.key[child]]] = tree.strings[tree.label[child]]
+                elif kind == GROUP:
+                    sub = LibertyGroup(tree.strings[tree.key[child]], tree.strings[tree.label[child]])
+                    group.children.append(sub)
+                    stack.append((child, sub))
+                else:
+                    group.children.append(tree.attribute(child))
+        return root
+
+
+def parse_columnar(file_path, **parser_kwargs) -> ColumnarTree:
+    """
+    Parse a library straight into <class 'ColumnarTree'>, no <class 'LibertyGroup'> is built.
+    :param file_path: Liberty file
+    :param parser_kwargs: Passed to <class 'LibertyParser'>, such as group_filter
+    """
+    builder = LibertyParser(file_path, **parser_kwargs).parse_events(ColumnarBuilder())
+    tree = builder.build()
+    logger.info(f"Parsed {file_path} into {len(tree)} columnar nodes, {tree.nbytes / 1e6:.1f} MB of arrays")
+    return tree
@@ -0,0 +1,214 @@
+import mmap
+import re
+from logging import getLogger
+from typing import Dict, List
+from dataclasses import dataclass
+
+from .liberty_parser import LibertyParser, LibertyGroup, ParseError, BLOCK_REGEX, scan_block_end
+
+logger = getLogger("main")
+
+# Comment, unrolled so that a match can't backtrack into a shorter or longer one
+COMMENT_PATTERN = rb'/\*[^*]*\*+(?:[^*/][^*]*\*+)*/|//[^\n]*(?![^\n])'
+
+# Cell statement up to its '{', such as `cell (AND2) /* note */ {`.
+# Matches inside comments, strings, other groups or longer words are ruled out by the scan.
+CELL_HEADER_REGEX = re.compile(rb'cell\s*\(\s*"?([^")\s]+)"?\s*\)(?:\s|' + COMMENT_PATTERN + rb')*\{')
+
+MAX_BLOCK_DEPTH = 16
+
+
+def _block_regex(depth):
+    """
+    Block of balanced braces nested up to depth, skipping strings and comments, matched in C.
+    Every item has one way to match, so a failed match costs linear time.
+    """
+    item = rb'[^{}"/]+(?![^{}"/])|"[^"\n]*"|' + COMMENT_PATTERN + rb'|/(?![*/])'
+    inner = rb'(?:' + item + rb')*'
+    for _ in range(depth - 1):
+        inner = rb'(?:' + item + rb'|\{' + inner + rb'\})*'
+    return re.compile(rb'\{' + inner + rb'\}')
+
+
+BALANCED_BLOCK_REGEX = _block_regex(MAX_BLOCK_DEPTH)
+
+
+def block_end(buffer, brace) -> int:
+    """
+    Position right after the '}' closing the block opened at buffer[brace].
+    Blocks are skipped by a single regex match, deeper or malformed ones are scanned token by token.
+    """
+    match = BALANCED_BLOCK_REGEX.match(buffer, brace)
+    if match is not None:
+        return match.end()
+    end = scan_block_end(buffer, brace + 1, depth=1)
+    if buffer[end - 1:end] != b'}':
+        raise ParseError("Unexpected EOF, unbalanced '{'")
+    return end
+
+
+def _depth_at(buffer, pos, stop, depth):
+    """
+    Brace depth at stop, from depth at pos.
+    :return: (depth, position the scan reached), past stop if stop is inside a comment or string
+    """
+    for match in BLOCK_REGEX.finditer(buffer, pos):
+        if match.start() >= stop:
+            break
+        if match.end() > stop:  # Comment or string around stop
+            return depth, match.end()
+        char = buffer[match.start()]
+        if char == 0x7b:  # {
+            depth += 1
+        elif char == 0x7d:  # }
+            depth -= 1
+    return depth, stop
+
+
+@dataclass
+class CellIndex:
+    """Location of a top-level cell block in the file"""
+    name: str
+    offset: int  # Byte offset of `cell` statement
+    length: int  # Byte length up to and including the closing '}'
+    line: int  # Line number of `cell` statement
+
+
+class LazyCell(LibertyGroup):
+    """
+    Placeholder of a cell block.
+    `group_type` and `name` are known from the index, params and children are parsed on first access.
+    """
+    def __init__(self, library: 'LazyLibrary', index: CellIndex):
+        self.group_type = "cell"
+        self.name = index.name
+        self._index = None
+        self._library = library
+        self._cell_index = index
+
+    def __getattr__(self, item):
+        # Only called while params/children slots are not set yet
+        if item in ('params', 'children', '_params', '_children'):
+            group = self._library.parse_cell(self._cell_index)
+            self._params = group._params
+            self._children = group._children
+            return getattr(self, item)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
+
+    @property
+    def loaded(self) -> bool:
+        try:
+            object.__getattribute__(self, '_children')
+        except AttributeError:
+            return False
+        return True
+
+
+class LazyLibrary:
+    """
+    Library opened by a single scan for top-level cell blocks.
+    Cells are parsed on first access and cached, the rest of the library is parsed upfront.
+    Such as:
+        with LazyLibrary('big.lib') as lib:
+            pin = lib.get(cell='AND2', pin='o')  # Parses AND2 only
+    """
+    def __init__(self, file_path, encoding='utf-8'):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.cells: List[CellIndex] = []  # In file order
+        self.index: Dict[str, CellIndex] = {}  # By name, the first of cells sharing a name
+
+        self._file = open(file_path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.root = self._scan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def _scan(self) -> LibertyGroup:
+        """
+        Index top-level cells, then parse the library with each cell replaced by an empty stub.
+        Cell headers are found by regex and cell bodies skipped by regex, both in C.
+        Only text between cells is scanned token by token, to rule out headers in comments or other groups.
+        """
+        mm = self._mm
+        cells: List[CellIndex] = []
+        pieces = []  # Library text without cell bodies
+        line, counted = 1, 0  # Line number at position counted
+        pos = 0  # Text before pos is in pieces
+        scan, depth = 0, 0  # Brace depth at scan
+
+        while True:
+            match = CELL_HEADER_REGEX.search(mm, scan)
+            if match is None:
+                break
+            offset = match.start()
+            if offset > 0 and (mm[offset - 1:offset].isalnum() or mm[offset - 1] == 0x5f):  # Such as test_cell
+                depth, scan = _depth_at(mm, scan, offset + 1, depth)
+                continue
+            depth, scan = _depth_at(mm, scan, offset, depth)
+            if scan > offset or depth != 1:  # Hidden in a comment or string, or not at library level
+                depth, scan = _depth_at(mm, scan, max(scan, offset + 1), depth)
+                continue
+
+            brace = match.end() - 1
+            line += mm[counted:offset].count(b'\n')
+            counted = offset
+            try:
+                end = block_end(mm, brace)
+            except ParseError as e:
+                raise ParseError(e.msg, line)
+            cells.append(CellIndex(match.group(1).decode(self.encoding), offset, end - offset, line))
+
+            # Keep line numbers of the library text in place
+            newlines = mm[brace:end].count(b'\n')
+            pieces += [mm[pos:brace + 1], b'}', b'\n' * newlines]
+            pos = scan = end
+        pieces.append(mm[pos:])
+
+        self.cells = cells
+        self.index = {}
+        for cell in cells:
+            self.index.setdefault(cell.name, cell)
+        logger.info(f"Indexed {len(cells)} cells in {self.file_path}")
+
+        root = LibertyParser.from_string(b''.join(pieces), encoding=self.encoding).parse()
+        stubs = [i for i, child in enumerate(root.children)
+                 if isinstance(child, LibertyGroup) and child.group_type == 'cell']
+        if len(stubs) != len(cells):
+            raise ParseError(f"Found {len(cells)} cell blocks, but {len(stubs)} cells in the library")
+        for i, cell in zip(stubs, cells):
+            if root.children[i].name != cell.name:
+                raise ParseError(f"Cell block {cell.name} doesn't match cell {root.children[i].name}", cell.line)
+            root.children[i] = LazyCell(self, cell)
+        return root
+
+    def parse_cell(self, index: CellIndex) -> LibertyGroup:
+        """
+        Parse a single cell block from the file
+        """
+        text = self._mm[index.offset:index.offset + index.length]
+        logger.debug("Parse cell %s at line %s", index.name, index.line)
+        return LibertyParser.from_string(text, first_line=index.line, encoding=self.encoding).parse()
+
+    def cell_names(self) -> List[str]:
+        return [cell.name for cell in self.cells]
+
+    def cell(self, name) -> LibertyGroup:
+        for child in self.root.children:
+            if isinstance(child, LibertyGroup) and child.match('cell', name):
+                return child
+        raise KeyError(name)
+
+    def get(self, *args, **kwargs):
+        """
+        Same lookup as `LibertyGroup.get`, only cells on the lookup path are parsed.
+        """
+        return self.root.get(*args, **kwargs)
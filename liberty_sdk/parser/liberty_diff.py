@@ -0,0 +1,284 @@
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .liberty_parser import LibertyGroup, LibertyAttribute, EMPTY_PARAMS, EMPTY_CHILDREN
+from .lookup_table import parse_rows, INDEX_NAMES
+
+logger = getLogger("main")
+
+# Params telling apart unnamed groups of the same type, such as timing () of different related_pin.
+# Not timing_sense, which is a property of the arc, so a sense change is a changed param of the same arc.
+KEY_PARAMS = ('related_pin', 'related_pg_pin', 'related_output_pin', 'timing_type', 'when', 'sdf_cond', 'mode')
+
+# Group types counted as arcs in `LibraryDiff.summary()`
+ARC_TYPES = ('timing', 'internal_power')
+
+TABLE_ATTRIBUTES = INDEX_NAMES + ('values',)
+
+
+def tree_digests(root: LibertyGroup) -> Dict[int, bytes]:
+    """
+    Merkle digest of every group under root, keyed by id(group).
+    A group's digest covers its type, name, params and children in order, children groups by digest,
+    so two groups of equal digest are equal and their subtrees need no comparison.
+    """
+    digests = {}
+    stack = [(root, False)]
+    while stack:
+        group, expanded = stack.pop()
+        if not expanded:
+            stack.append((group, True))
+            stack.extend((child, False) for child in group._children or EMPTY_CHILDREN
+                         if isinstance(child, LibertyGroup))
+            continue
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"G\0{group.group_type}\0{group.name}\0".encode())
+        for k, v in (group._params or EMPTY_PARAMS).items():
+            h.update(f"P\0{k}\0{v}\0".encode())
+        for child in group._children or EMPTY_CHILDREN:
+            if isinstance(child, LibertyGroup):
+                h.update(digests[id(child)])
+            elif isinstance(child, LibertyAttribute):
+                h.update(f"A\0{child.name}\0{child.value}\0".encode())
+            else:
+                h.update(f"C\0{child.name}\0{chr(1).join(child.params)}\0".encode())
+        digests[id(group)] = h.digest()
+    return digests
+
+
+def group_key(group: LibertyGroup, key_params=KEY_PARAMS) -> tuple:
+    """Key matching a group to its counterpart in the other library"""
+    params = group._params or EMPTY_PARAMS
+    return (group.group_type, group.name) + tuple(params.get(k) for k in key_params if k in params)
+
+
+def segment(group: LibertyGroup, key_params=KEY_PARAMS) -> str:
+    """Path segment of a group, such as `cell (AND2)` or `timing (related_pin="A")`"""
+    if group.name:
+        return f"{group.group_type} ({group.name})"
+    params = group._params or EMPTY_PARAMS
+    return f"{group.group_type} ({', '.join(f'{k}={params[k]}' for k in key_params if k in params)})"
+
+
+@dataclass
+class Difference:
+    """One difference between the old and the new library"""
+    kind: str  # added, removed or changed
+    target: str  # group, attribute or table
+    path: Tuple[str, ...]  # Segments of the enclosing groups, such as ('cell (AND2)', 'pin (o)')
+    name: str  # Group type or attribute name
+    old: object = None
+    new: object = None
+    detail: str = ''
+
+    def __str__(self):
+        location = '/'.join(self.path)
+        if self.target == 'group':
+            return f"{self.kind:<8} {location}"
+        text = f"{self.kind:<8} {location}: {self.name}"
+        if self.detail:
+            return f"{text} ({self.detail})"
+        if self.kind == 'changed':
+            return f"{text}: {self.old!r} -> {self.new!r}"
+        return f"{text}: {self.new if self.kind == 'added' else self.old!r}"
+
+
+@dataclass
+class LibraryDiff:
+    differences: List[Difference]
+    compared: int = 0  # Group pairs compared
+    skipped: int = 0  # Group pairs skipped as identical by digest
+    tables: int = 0  # Numeric tables compared, within tolerance or not
+
+    def __bool__(self):
+        return bool(self.differences)
+
+    def __len__(self):
+        return len(self.differences)
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """
+        Counts of added, removed and changed cells, pins, arcs, attributes and tables.
+        A group is changed if anything under it differs.
+        """
+        counts = defaultdict(lambda: {'added': 0, 'removed': 0, 'changed': 0})
+        changed = set()
+        for diff in self.differences:
+            if diff.target == 'group':
+                counts[_category(diff.name)][diff.kind] += 1
+                ancestors = diff.path[:-1]
+            else:
+                counts[diff.target][diff.kind] += 1
+                ancestors = diff.path
+            for i in range(1, len(ancestors) + 1):
+                changed.add(ancestors[:i])
+        for path in changed:
+            group_type = path[-1].split(' (', 1)[0]
+            if len(path) > 1:  # Not the library itself
+                counts[_category(group_type)]['changed'] += 1
+        return {k: dict(v) for k, v in counts.items()}
+
+    def report(self) -> str:
+        lines = [str(diff) for diff in self.differences]
+        lines.append(f"{len(self.differences)} differences, {self.compared} groups compared, "
+                     f"{self.skipped} identical subtrees skipped, {self.tables} tables compared")
+        return '\n'.join(lines)
+
+
+def _category(group_type) -> str:
+    if group_type in ('cell', 'pin', 'bus', 'bundle'):
+        return group_type
+    return 'arc' if group_type in ARC_TYPES else 'group'
+
+
+def _attributes(group: LibertyGroup) -> Dict[tuple, object]:
+    """Complex attributes keyed by (name, occurrence), such as ('voltage_map', 1) of the second one"""
+    seen = defaultdict(int)
+    result = {}
+    for child in group._children or EMPTY_CHILDREN:
+        if not isinstance(child, LibertyGroup):
+            result[(child.name, seen[child.name])] = child
+            seen[child.name] += 1
+    return result
+
+
+def _attribute_value(attr):
+    return attr.value if isinstance(attr, LibertyAttribute) else list(attr.params)
+
+
+def _table_array(attr) -> Optional[np.ndarray]:
+    array = getattr(attr, 'array', None)  # Numeric tables of lookup_table
+    if array is not None:
+        return array
+    try:
+        return parse_rows([attr.value] if isinstance(attr, LibertyAttribute) else list(attr.params))
+    except ValueError:
+        return None
+
+
+class _TableBatch:
+    """Numeric table pairs gathered over the whole walk, then compared by shape in one vectorized pass"""
+    def __init__(self, rtol, atol):
+        self.rtol = rtol
+        self.atol = atol
+        self.pairs: Dict[tuple, List[tuple]] = defaultdict(list)  # shape -> [(path, name, old, new)]
+
+    def add(self, path, name, old, new):
+        self.pairs[old.shape].append((path, name, old, new))
+
+    def compare(self) -> Tuple[List[Difference], int]:
+        differences, count = [], 0
+        for shape, pairs in self.pairs.items():
+            old = np.stack([pair[2] for pair in pairs]).reshape(len(pairs), -1)
+            new = np.stack([pair[3] for pair in pairs]).reshape(len(pairs), -1)
+            delta = np.abs(new - old)
+            bad = ~(delta <= self.atol + self.rtol * np.abs(old))  # NaN counts as different
+            if shape and delta.shape[1]:
+                failed = np.flatnonzero(bad.any(axis=1))
+                max_delta = np.nanmax(np.where(np.isnan(delta), np.inf, delta), axis=1)
+            else:
+                failed, max_delta = np.array([], dtype=int), np.zeros(len(pairs))
+            count += len(pairs)
+            for i in failed.tolist():
+                path, name, a, b = pairs[i]
+                position = np.unravel_index(int(np.argmax(np.where(bad[i], delta[i], -1))), a.shape)
+                differences.append(Difference(
+                    'changed', 'table', path, name, a, b,
+                    detail=f"max |delta| {max_delta[i]:.6g} at {tuple(int(p) for p in position)}, "
+                           f"{int(bad[i].sum())}/{bad[i].size} values out of tolerance",
+                ))
+        return differences, count
+
+
+def diff_libraries(old: LibertyGroup, new: LibertyGroup, rtol=1e-6, atol=0.0,
+                   key_params=KEY_PARAMS) -> LibraryDiff:
+    """
+    Compare two libraries, such as a vendor drop against the previous one.
+    Subtrees of equal Merkle digest are skipped without a walk. Groups are matched by type, name and
+    key_params, attributes by name. index_* and values of tables are compared numerically, within
+    |new - old| <= atol + rtol * |old|, batched over all tables of the same shape.
+    Such as:
+        diff = diff_libraries(LibertyParser('v1.lib').parse(), LibertyParser('v2.lib').parse(), rtol=1e-3)
+        print(diff.summary()['cell'])  # {'added': 2, 'removed': 0, 'changed': 17}
+    :return: <class 'LibraryDiff'>
+    """
+    old_digests, new_digests = tree_digests(old), tree_digests(new)
+    tables = _TableBatch(rtol, atol)
+    result = LibraryDiff([])
+
+    stack = [(old, new, (segment(old, key_params),))]
+    while stack:
+        a, b, path = stack.pop()
+        if old_digests[id(a)] == new_digests[id(b)]:
+            result.skipped += 1
+            continue
+        result.compared += 1
+        differences = result.differences
+
+        # Simple attributes
+        a_params, b_params = a._params or EMPTY_PARAMS, b._params or EMPTY_PARAMS
+        for k, v in a_params.items():
+            if k not in b_params:
+                differences.append(Difference('removed', 'attribute', path, k, old=v))
+            elif b_params[k] != v:
+                differences.append(Difference('changed', 'attribute', path, k, v, b_params[k]))
+        differences.extend(Difference('added', 'attribute', path, k, new=v)
+                           for k, v in b_params.items() if k not in a_params)
+
+        # Complex attributes, tables numerically
+        a_attrs, b_attrs = _attributes(a), _attributes(b)
+        for key, attr in a_attrs.items():
+            other = b_attrs.get(key)
+            if other is None:
+                differences.append(Difference('removed', 'attribute', path, key[0], old=_attribute_value(attr)))
+                continue
+            old_value, new_value = _attribute_value(attr), _attribute_value(other)
+            if key[0] in TABLE_ATTRIBUTES:
+                old_array, new_array = _table_array(attr), _table_array(other)
+                if old_array is not None and new_array is not None:
+                    if old_array.shape != new_array.shape:
+                        differences.append(Difference('changed', 'table', path, key[0], old_array, new_array,
+                                                      detail=f"shape {old_array.shape} -> {new_array.shape}"))
+                    else:
+                        tables.add(path, key[0], old_array, new_array)
+                    continue
+            if old_value != new_value:
+                differences.append(Difference('changed', 'attribute', path, key[0], old_value, new_value))
+        differences.extend(Difference('added', 'attribute', path, key[0], new=_attribute_value(attr))
+                           for key, attr in b_attrs.items() if key not in a_attrs)
+
+        # Subgroups
+        b_groups = defaultdict(list)
+        for child in b._children or EMPTY_CHILDREN:
+            if isinstance(child, LibertyGroup):
+                b_groups[group_key(child, key_params)].append(child)
+        matched = set()
+        pending = []
+        for child in a._children or EMPTY_CHILDREN:
+            if not isinstance(child, LibertyGroup):
+                continue
+            candidates = b_groups.get(group_key(child, key_params))
+            child_path = path + (segment(child, key_params),)
+            if candidates:
+                other = candidates.pop(0)
+                matched.add(id(other))
+                pending.append((child, other, child_path))
+            else:
+                differences.append(Difference('removed', 'group', child_path, child.group_type, old=child))
+        for child in b._children or EMPTY_CHILDREN:
+            if isinstance(child, LibertyGroup) and id(child) not in matched:
+                differences.append(Difference('added', 'group', path + (segment(child, key_params),),
+                                              child.group_type, new=child))
+        stack.extend(reversed(pending))
+
+    table_differences, result.tables = tables.compare()
+    result.differences.extend(table_differences)
+    logger.info(f"Compared libraries: {len(result.differences)} differences, {result.compared} groups compared, "
+                f"{result.skipped} identical subtrees skipped")
+    return result
@@ -0,0 +1,171 @@
+import json
+from logging import getLogger
+from typing import Iterator, TextIO
+
+from .liberty_parser import LibertyGroup, LibertyAttribute, ComplexLibertyAttribute, ParseError, \
+    EMPTY_PARAMS, EMPTY_CHILDREN
+
+logger = getLogger("main")
+
+
+class _Groups(list):
+    """Subgroups under the 'group' key of a group object, written as they're reached"""
+    pass
+
+
+def _json_items(group: LibertyGroup) -> dict:
+    """
+    Keys of the group object in the order of `LibertyGroup.asdict()`, with subgroups left unconverted
+    """
+    data = {'type': group.group_type, 'name': group.name}
+    data.update(group._params or EMPTY_PARAMS)
+    for child in group._children or EMPTY_CHILDREN:
+        if isinstance(child, (LibertyAttribute, ComplexLibertyAttribute)):
+            data[child.name] = child.asdict()
+        elif isinstance(child, LibertyGroup):
+            if 'group' not in data:
+                data['group'] = _Groups()
+            if isinstance(data['group'], _Groups):
+                data['group'].append(child)
+        else:
+            raise ParseError(f"Unrecognized data type: {type(child)}")
+    return data
+
+
+def iter_json(root: LibertyGroup, indent=2, separators=None, ensure_ascii=True) -> Iterator[str]:
+    """
+    Generate JSON text of a tree in chunks, the same text as
+    `json.dumps(root, cls=LibertyJSONEncoder, indent=indent, separators=separators)`.
+    Only one group is converted to a dict at a time, the tree is never materialized as `asdict()`.
+    """
+    if isinstance(indent, int):
+        indent = ' ' * indent
+    if separators is None:
+        separators = (',', ': ') if indent is not None else (', ', ': ')
+    item_separator, key_separator = separators
+
+    def encode(value, level):
+        text = json.dumps(value, indent=indent, separators=separators, ensure_ascii=ensure_ascii)
+        # Strings escape their newlines, so these are all line breaks of nested lists
+        return text.replace('\n', newline(level)) if indent and level else text
+
+    def newline(level):
+        return '\n' + indent * level if indent is not None else ''
+
+    if not isinstance(root, LibertyGroup):
+        yield encode(root.asdict(), 0)
+        return
+
+    yield '{'
+    # Stack of [iterator over (key, value), level of items, first item pending, closing bracket]
+    stack = [[iter(_json_items(root).items()), 1, True, '}']]
+    while stack:
+        frame = stack[-1]
+        items, level = frame[0], frame[1]
+        for key, value in items:
+            chunk = newline(level) if frame[2] else item_separator + newline(level)
+            frame[2] = False
+            if key is not None:
+                chunk += encode(key, 0) + key_separator
+
+            if isinstance(value, LibertyGroup):
+                yield chunk + '{'
+                stack.append([iter(_json_items(value).items()), level + 1, True, '}'])
+                break
+            if isinstance(value, _Groups):
+                yield chunk + '['
+                stack.append([((None, group) for group in value), level + 1, True, ']'])
+                break
+            yield chunk + encode(value, level)
+        else:
+            stack.pop()
+            yield frame[3] if frame[2] else newline(level - 1) + frame[3]
+
+
+def _write(fileobj, chunks, buffer_size) -> int:
+    written, pending, size = 0, [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            fileobj.write(''.join(pending))
+            written += size
+            pending, size = [], 0
+    if pending:
+        fileobj.write(''.join(pending))
+        written += size
+    return written
+
+
+def dump_json(root: LibertyGroup, fileobj: TextIO, indent=2, ensure_ascii=True, buffer_size=1 << 20) -> int:
+    """
+    Stream a tree as JSON to a file opened for writing.
+    Output is identical to `json.dump(root, fileobj, cls=LibertyJSONEncoder, indent=indent)`,
+    with memory bounded by the largest single group rather than the whole library.
+    :return: Number of characters written
+    """
+    written = _write(fileobj, iter_json(root, indent=indent, ensure_ascii=ensure_ascii), buffer_size)
+    logger.debug("Wrote %s characters of JSON", written)
+    return written
+
+
+def iter_ndjson(library: LibertyGroup, group_type='cell', ensure_ascii=True) -> Iterator[str]:
+    """
+    Generate NDJSON lines of a library: first the library object with its group_type subgroups
+    left out, then one compact object per group_type subgroup, such as one line per cell.
+    Each line is terminated by a newline.
+    """
+    header = LibertyGroup(library.group_type, library.name, library.params,
+                          [child for child in library.children
+                           if not (isinstance(child, LibertyGroup) and child.group_type == group_type)])
+    for group in [header] + [child for child in library.children
+                             if isinstance(child, LibertyGroup) and child.group_type == group_type]:
+        yield ''.join(iter_json(group, indent=None, separators=(',', ':'), ensure_ascii=ensure_ascii)) + '\n'
+
+
+def dump_ndjson(library: LibertyGroup, fileobj: TextIO, group_type='cell', ensure_ascii=True,
+                buffer_size=1 << 20) -> int:
+    """
+    Write a library as NDJSON, see `iter_ndjson()`.
+    Lines can be split among workers, such as by Spark or `pandas.read_json(lines=True)`.
+    :return: Number of characters written
+    """
+    return _write(fileobj, iter_ndjson(library, group_type=group_type, ensure_ascii=ensure_ascii), buffer_size)
+
+
+def _group_hook(data: dict):
+    # Called by the JSON decoder on each object as it's completed, innermost first,
+    # so subgroups arrive converted already and no dict tree is kept
+    if 'type' in data and 'name' in data:
+        return LibertyGroup.from_dict(data)
+    return data
+
+
+def load_json(fileobj: TextIO) -> LibertyGroup:
+    """
+    Load a tree from JSON in the layout of `LibertyGroup.asdict()`, as written by `dump_json()`.
+    Each group is rebuilt as soon as the decoder completes it, see `LibertyGroup.from_dict()`
+    for how attributes are told apart. Repeated attributes, such as voltage_map, are
+    collapsed by the layout itself, so only the last one comes back.
+    """
+    return json.load(fileobj, object_hook=_group_hook)
+
+
+def iter_load_ndjson(fileobj: TextIO) -> Iterator[LibertyGroup]:
+    """
+    Load NDJSON written by `dump_ndjson()` lazily, one group per line, library header first
+    """
+    for line in fileobj:
+        if line.strip():
+            yield json.loads(line, object_hook=_group_hook)
+
+
+def load_ndjson(fileobj: TextIO) -> LibertyGroup:
+    """
+    Load a library from NDJSON written by `dump_ndjson()`.
+    Groups of the following lines, such as cells, are appended after the header's own children.
+    """
+    groups = iter_load_ndjson(fileobj)
+    library = next(groups)
+    library.children.extend(groups)
+    return library
@@ -1,23 +1,247 @@
-from .liberty_parser import ParseError
+import os
+import json
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from logging import getLogger
+from typing import Dict, List, Optional, Sequence, Type
+
+from .liberty_parser import LibertyParser, LibertyHandler, Location, ParseError
 
 logger = getLogger("main")
 
 
+class LintRule(LibertyHandler):
+    """
+    Base of linter rules. A rule subscribes to parse events by overriding the callbacks of
+    <class 'LibertyHandler'>, and reports through `report()`. All rules share one parse of the file.
+    Such as:
+        class NoDontUse(LintRule):
+            code, level = "W900", "warning"
+
+            def attribute(self, name, value):
+                if name == 'dont_use' and value == 'true':
+                    self.report(f"Cell {self.path[-1][1]} is dont_use")
+    """
+    code = "W000"
+    level = "warning"  # error or warning
+
+    def __init__(self, linter: 'LibertyLinter'):
+        self.linter = linter
+
+    @property
+    def path(self):
+        """Open groups as [(group_type, name)], outermost first"""
+        return self.linter.path
+
+    def location(self) -> Optional[Location]:
+        return self.linter.location()
+
+    def report(self, msg, loc: Location = None, level=None, code=None):
+        self.linter.add_diagnostics(level or self.level, code or self.code, msg, loc or self.location())
+
+    def finish(self):
+        """Called once the whole file is parsed"""
+        pass
+
+
+class BracketRule(LintRule):
+    """Closing brace not aligned with the statement opening its group"""
+    code = "W102"
+
+    def __init__(self, linter):
+        super().__init__(linter)
+        self.open_columns = []
+
+    def start_group(self, group_type, name):
+        loc = self.location()
+        self.open_columns.append((loc.indent, loc.start_line, group_type, name))
+
+    def end_group(self):
+        indent, line, group_type, name = self.open_columns.pop()
+        loc = self.location()
+        if indent is not None and loc.indent is not None and loc.indent != indent:
+            self.report(f"'}}' of {group_type} ({name}) at line {line} is indented {loc.indent}, "
+                        f"expected {indent}", loc)
+
+
+class IndentationRule(LintRule):
+    """
+    Statement not indented by indent_width per group level. Unless set, indent_width is taken from
+    the first indented statement, such as 2 for files written by `dump()`. Tabs count to tab stops.
+    """
+    code = "W202"
+    indent_width: Optional[int] = None  # Columns per group level, None to infer it
+
+    def __init__(self, linter):
+        super().__init__(linter)
+        self.width = self.indent_width
+
+    def _check(self, depth):
+        loc = self.location()
+        if loc is None or loc.indent is None:  # Not first on its line
+            return
+        if self.width is None and depth and loc.indent:
+            self.width = loc.indent // depth if loc.indent % depth == 0 else loc.indent
+        if self.width is None and depth:  # No indented statement yet to infer from
+            return
+        expected = depth * (self.width or 0)
+        if loc.indent != expected:
+            self.report(f"Indentation should be {expected} columns, got {loc.indent}", loc)
+
+    def start_group(self, group_type, name):
+        self._check(len(self.path) - 1)
+
+    def end_group(self):
+        self._check(len(self.path) - 1)
+
+    def attribute(self, name, value):
+        self._check(len(self.path))
+
+    def complex_attribute(self, name, params):
+        self._check(len(self.path))
+
+
+class UnitRule(LintRule):
+    """
+    Library units: missing (W301), not a legal value (E302), defined twice with different values (W303)
+    """
+    code = "E302"
+    level = "error"
+
+    UNITS = {
+        'time_unit': {'"1ps"', '"10ps"', '"100ps"', '"1ns"'},
+        'voltage_unit': {'"1mV"', '"10mV"', '"100mV"', '"1V"'},
+        'current_unit': {'"1uA"', '"10uA"', '"100uA"', '"1mA"', '"1A"'},
+        'pulling_resistance_unit': {'"1ohm"', '"10ohm"', '"100ohm"', '"1kohm"'},
+        'leakage_power_unit': {'"1pW"', '"10pW"', '"100pW"', '"1nW"', '"10nW"', '"100nW"', '"1uW"', '"10uW"',
+                               '"100uW"', '"1mW"'},
+    }
+    CAPACITIVE_LOAD_UNIT = ({'1', '10', '100'}, {'ff', 'pf'})
+    REQUIRED = ('time_unit', 'voltage_unit', 'current_unit', 'capacitive_load_unit')
+
+    def __init__(self, linter):
+        super().__init__(linter)
+        self.units: Dict[str, tuple] = {}  # name -> (value, location)
+        self.library_loc = None
+
+    def start_group(self, group_type, name):
+        if len(self.path) == 1:
+            self.library_loc = self.location()
+
+    def _define(self, name, value):
+        loc = self.location()
+        previous = self.units.get(name)
+        if previous is not None and previous[0] != value:
+            self.report(f"{name} redefined as {value}, was {previous[0]} at line {previous[1].start_line}",
+                        loc, level="warning", code="W303")
+        self.units.setdefault(name, (value, loc))
+        return loc
+
+    def attribute(self, name, value):
+        if len(self.path) != 1 or name not in self.UNITS:
+            return
+        loc = self._define(name, value)
+        if value not in self.UNITS[name] and f'"{value}"' not in self.UNITS[name]:
+            self.report(f"{name} {value} is not one of {', '.join(sorted(self.UNITS[name]))}", loc)
+
+    def complex_attribute(self, name, params):
+        if len(self.path) != 1 or name != 'capacitive_load_unit':
+            return
+        value = ', '.join(params)
+        loc = self._define(name, value)
+        scales, units = self.CAPACITIVE_LOAD_UNIT
+        if len(params) != 2 or params[0].strip() not in scales or params[1].strip().lower() not in units:
+            self.report(f"capacitive_load_unit ({value}) should be (1|10|100, ff|pf)", loc)
+
+    def finish(self):
+        if self.library_loc is None:
+            return
+        for name in self.REQUIRED:
+            if name not in self.units:
+                self.report(f"Library has no {name}", self.library_loc, level="warning", code="W301")
+
+
+class DuplicateGroupRule(LintRule):
+    """Named group defined twice in the same parent, such as two pin (A) in a cell"""
+    code = "E401"
+    level = "error"
+    GROUP_TYPES = ('cell', 'pin', 'bus', 'bundle', 'pg_pin', 'lu_table_template', 'power_lut_template', 'type')
+
+    def __init__(self, linter):
+        super().__init__(linter)
+        self.seen = [{}]  # Per open group: (group_type, name) -> line
+
+    def start_group(self, group_type, name):
+        if group_type in self.GROUP_TYPES and name:
+            siblings = self.seen[-1]
+            if (group_type, name) in siblings:
+                self.report(f"{group_type} ({name}) already defined at line {siblings[(group_type, name)]}")
+            else:
+                siblings[(group_type, name)] = self.location().start_line
+        self.seen.append({})
+
+    def end_group(self):
+        self.seen.pop()
+
+
+DEFAULT_RULES: List[Type[LintRule]] = [BracketRule, IndentationRule, UnitRule, DuplicateGroupRule]
+
+
+class _Dispatcher(LibertyHandler):
+    """Fan parse events out to rules, only to those overriding the event"""
+    def __init__(self, linter: 'LibertyLinter', rules: List[LintRule]):
+        self.linter = linter
+        self.callbacks = {
+            event: [getattr(rule, event) for rule in rules
+                    if getattr(type(rule), event) is not getattr(LibertyHandler, event)]
+            for event in ('start_group', 'end_group', 'attribute', 'complex_attribute')
+        }
+
+    def start_group(self, group_type, name):
+        self.linter.path.append((group_type, name))
+        for callback in self.callbacks['start_group']:
+            callback(group_type, name)
+
+    def end_group(self):
+        for callback in self.callbacks['end_group']:
+            callback()
+        self.linter.path.pop()
+
+    def attribute(self, name, value):
+        for callback in self.callbacks['attribute']:
+            callback(name, value)
+
+    def complex_attribute(self, name, params):
+        for callback in self.callbacks['complex_attribute']:
+            callback(name, params)
+
+
 class LibertyLinter:
     """
-    ast = LibertyParser().parse_file()
-    linter = LibertyLinter(ast)
+    Check a Liberty file in a single streaming pass, all rules subscribing to the same parse events.
+    No tree is built, so memory doesn't grow with the file.
+
+    linter = LibertyLinter('big.lib')
     linter.run_checks()
 
-    print(linter.generator_report())
+    print(linter.generate_report())
 
     sys.exit(1 if linter.errors else 0)
     """
-    def __init__(self, parsed_ast):
-        self.ast = parsed_ast  # Abstract Syntax Tree
+    def __init__(self, file_path, rules: Sequence[Type[LintRule]] = None, encoding='utf-8'):
+        """
+        Args:
+            file_path: Liberty file
+            rules: Rule classes to run, default to DEFAULT_RULES
+            encoding: File encoding
+        """
+        self.file_path = file_path
+        self.rule_types = list(DEFAULT_RULES if rules is None else rules)
+        self.encoding = encoding
         self.errors = []
         self.warnings = []
+        self.path = []  # Open groups as (group_type, name)
+        self._parser: Optional[LibertyParser] = None
 
     def add_diagnostics(self, level, code, msg, loc):
         entry = {
@@ -36,37 +260,87 @@ class LibertyLinter:
         else:
             self.warnings.append(entry)
 
+    def location(self) -> Optional[Location]:
+        return self._parser.location() if self._parser is not None else None
+
+    def run_checks(self) -> bool:
+        """
+        Parse the file once, running every rule
+        :return: True if no error is found
+        """
+        rules = [rule_type(self) for rule_type in self.rule_types]
+        self._parser = LibertyParser(self.file_path, encoding=self.encoding)
+        try:
+            self._parser.parse_events(_Dispatcher(self, rules))
+        except ParseError as e:
+            self.add_diagnostics("error", "E001", f"Syntax error: {e.msg}", Location(e.line or 0))
+        else:
+            for rule in rules:
+                rule.finish()
+        finally:
+            self._parser = None
+            self.path = []
+
+        key = self._sort_key
+        self.errors.sort(key=key)
+        self.warnings.sort(key=key)
+        logger.info(f"Linted {self.file_path}: {len(self.errors)} errors, {len(self.warnings)} warnings")
+        return not self.errors
+
     @staticmethod
-    def check_indentation(self, file_path):
-        indent_stack = [0]  # 记录缩进级别栈
-        for node in self.ast.walk_with_raw():  # 带原始行信息的遍历
-            curr_indent = node.raw.leading_spaces
-
-            if node.type == "block_close":  # 遇到}时缩进回退
-                indent_stack.pop()
-                expected = indent_stack[-1]
-            else:
-                expected = indent_stack[-1] + 4  # 默认4空格缩进
+    def _sort_key(entry):
+        return entry["location"]["start_line"], entry["location"]["column"], entry["code"]
 
-            if curr_indent != expected:
-                self.add_diagnostic(
-                    level="warning",
-                    code="W202",
-                    msg=f"缩进应为{expected}空格，实际为{curr_indent}",
-                    loc=node.loc
-                )
+    @property
+    def diagnostics(self) -> List[dict]:
+        return sorted(self.errors + self.warnings, key=self._sort_key)
 
-            if node.type == "block_open":  # 遇到{时压入新缩进级别
-                indent_stack.append(expected)
+    def generate_report(self, as_json=False) -> str:
+        if as_json:
+            return json.dumps({"file": self.file_path, "errors": self.errors, "warnings": self.warnings}, indent=2)
+        lines = [f"{self.file_path}:{d['location']['start_line']}:{d['location']['column']}: "
+                 f"{d['level']} {d['code']} {d['message']}" for d in self.diagnostics]
+        lines.append(f"{len(self.errors)} errors, {len(self.warnings)} warnings")
+        return '\n'.join(lines)
 
-        return True
 
-    @staticmethod
-    def check_bracket(self, file_path):
-        stack = []
-        return None
+def _run_shard(file_path, rules, encoding):
+    """Worker: run a subset of rules over the whole file"""
+    linter = LibertyLinter(file_path, rules=rules, encoding=encoding)
+    linter.run_checks()
+    return linter.errors, linter.warnings
 
-    @staticmethod
-    def check_unit_consistency():
-        unit_mapping = {}
-        return None
\ No newline at end of file
+
+def lint_sharded(file_path, rules: Sequence[Type[LintRule]] = None, shards=None, encoding='utf-8') -> LibertyLinter:
+    """
+    Run rule sets in parallel processes, each parsing the file once with its share of the rules.
+    Pays off for expensive rule sets over very large libraries.
+    :param rules: Rule classes, default to DEFAULT_RULES. They must be importable top-level classes.
+    :param shards: Number of processes, default to CPU count, at most one per rule
+    :return: <class 'LibertyLinter'> holding the merged diagnostics
+    """
+    rules = list(DEFAULT_RULES if rules is None else rules)
+    shards = max(1, min(shards or os.cpu_count() or 1, len(rules)))
+    rule_sets = [rules[i::shards] for i in range(shards)]
+
+    merged = LibertyLinter(file_path, rules=rules, encoding=encoding)
+    if shards == 1:
+        merged.run_checks()
+        return merged
+
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        results = list(pool.map(_run_shard, [file_path] * shards, rule_sets, [encoding] * shards))
+
+    # Syntax errors are found by every shard, keep one
+    seen = defaultdict(set)
+    for errors, warnings in results:
+        for target, entries in ((merged.errors, errors), (merged.warnings, warnings)):
+            for entry in entries:
+                key = json.dumps(entry, sort_keys=True)
+                if entry["code"] == "E001" and key in seen["E001"]:
+                    continue
+                seen[entry["code"]].add(key)
+                target.append(entry)
+    merged.errors.sort(key=LibertyLinter._sort_key)
+    merged.warnings.sort(key=LibertyLinter._sort_key)
+    return merged
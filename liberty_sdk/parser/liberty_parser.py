@@ -1,10 +1,17 @@
+import os
+import sys
 import json
+import mmap
 import re
+import fnmatch
+import functools
 from enum import Enum
+from collections import deque
 from logging import getLogger
-from functools import lru_cache
-from typing import Dict, List, Optional
-from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, TextIO
+from types import MappingProxyType
+
+from .query_cache import cached_query
 
 logger = getLogger("main")
 
@@ -22,13 +29,18 @@ class LibertyJSONEncoder(json.JSONEncoder):
 class ParseError(Exception):
     def __init__(self, msg, line=None):
         super().__init__(f"Line {line}: {msg}" if line else msg)
+        self.msg = msg
+        self.line = line
+
+    def __reduce__(self):
+        # Keep line number when sent back from worker processes
+        return type(self), (self.msg, self.line)
 
 
+@functools.lru_cache(maxsize=None)
 def indent(level=0, separator='  '):
-    indentation = ''
-    for _ in range(level):
-        indentation += separator
-    return indentation
+    # Cached, dump() asks for the same few indentation strings millions of times
+    return separator * level
 
 
 def list2dict(l):
@@ -62,18 +74,191 @@ class TokenType(Enum):
     KEYWORD = 5
 
 
-@dataclass
 class LibertyToken:
-    type: TokenType
-    value: str
-    line: int
+    __slots__ = ('type', 'value', 'line', 'column')
+
+    def __init__(self, type: TokenType, value: str, line: int, column: int = 0):
+        self.type = type
+        self.value = value
+        self.line = line
+        self.column = column  # 1-based, in bytes with tabs of the indentation to tab stops. 0 if unknown
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.type, self.value, self.line) == (other.type, other.value, other.line)
+
+    def __repr__(self):
+        return f"{type(self).__qualname__}(type={self.type!r}, value={self.value!r}, line={self.line!r})"
+
+
+class Location:
+    """Source span of a statement, such as reported in linter diagnostics"""
+    __slots__ = ('start_line', 'end_line', 'start_column', 'end_column', 'indent')
+
+    def __init__(self, start_line, end_line=None, start_column=0, end_column=0, indent=None):
+        self.start_line = start_line
+        self.end_line = start_line if end_line is None else end_line
+        self.start_column = start_column
+        self.end_column = end_column
+        self.indent = indent  # Leading columns if the statement starts its line, else None
+
+    def __repr__(self):
+        return f"Location({self.start_line}:{self.start_column}-{self.end_line}:{self.end_column})"
+
+
+class TokenStream:
+    """
+    Lookahead buffer over a token generator.
+    Only the previous token, the current token and the peeked token are kept in memory,
+    so the parser runs in a single pass regardless of the file size.
+    """
+    def __init__(self, tokens: Iterator[LibertyToken], lookahead=1):
+        self._tokens = iter(tokens)
+        self._buffer = deque()
+        self._lookahead = lookahead
+        self.prev: Optional[LibertyToken] = None
+        self.position = 0  # Index of current token
+
+    def _fill(self, size):
+        """Pull tokens from generator until buffer holds `size` tokens. Return False on EOF."""
+        while len(self._buffer) < size:
+            token = next(self._tokens, None)
+            if token is None:
+                return False
+            self._buffer.append(token)
+        return True
+
+    def current(self) -> Optional[LibertyToken]:
+        return self._buffer[0] if self._fill(1) else None
+
+    def peek(self, offset=1) -> Optional[LibertyToken]:
+        if offset > self._lookahead:
+            raise ValueError(f"Peek offset {offset} exceeds lookahead {self._lookahead}")
+        return self._buffer[offset] if self._fill(offset + 1) else None
+
+    def advance(self) -> None:
+        if self._fill(1):
+            self.prev = self._buffer.popleft()
+        self.position += 1
+
+    def skip_block(self, depth=1) -> None:
+        """
+        Discard tokens up to and including the '}' that closes the current block.
+        Nothing is built for the skipped subtree. Tokens already buffered are counted one by one,
+        the rest of the block is skipped by the tokenizer in raw bytes.
+        """
+        while self._buffer and depth:
+            token = self._buffer.popleft()
+            depth += _brace_delta(token)
+            self.prev = token
+            self.position += 1
+
+        if not depth:
+            return
+
+        if hasattr(self._tokens, 'send'):
+            # Tokenizer skips the rest of the block in raw bytes and returns the token after it
+            try:
+                self._buffer.append(self._tokens.send(depth))
+            except StopIteration:
+                pass
+            self.position += 1
+            return
+
+        for token in self._tokens:
+            self.position += 1
+            depth += _brace_delta(token)
+            if not depth:
+                self.prev = token
+                return
+
+
+# Raw block scanning, strings and comments may contain braces
+BLOCK_REGEX = re.compile(rb'"[^"\n]*"|/\*.*?\*/|//[^\n]*|[{}]', re.S)
+
+
+def scan_block_end(buffer, pos, depth=0) -> int:
+    """
+    Scan raw bytes for the '}' that closes the block open at pos.
+    :param depth: Number of blocks already open at pos
+    :return: Position right after the closing '}', or length of buffer if never closed.
+    """
+    for match in BLOCK_REGEX.finditer(buffer, pos):
+        char = buffer[match.start()]
+        if char == 0x7b:  # {
+            depth += 1
+        elif char == 0x7d:  # }
+            depth -= 1
+            if depth <= 0:
+                return match.end()
+    return len(buffer)
+
+
+def _brace_delta(token: LibertyToken) -> int:
+    if token.type == TokenType.SYMBOL:
+        if token.value == '{':
+            return 1
+        if token.value == '}':
+            return -1
+    return 0
+
+
+class GroupFilter:
+    """
+    Select subtrees to build while parsing. Rejected groups are skipped at token level.
+    Such as:
+        GroupFilter(cells=['AND2', 'NAND*'])              # Only keep matching cells
+        GroupFilter(group_types=['cell', 'pin'])          # Prune everything below pin
+    Root group is always kept.
+    """
+    def __init__(self, cells=None, group_types=None):
+        """
+        Args:
+            cells: Cell names or glob patterns to keep. None keeps all cells.
+            group_types: Group types to keep. None keeps all group types.
+        """
+        self.cells = self._compile(cells)
+        self.group_types = set(group_types) if group_types is not None else None
+
+    @staticmethod
+    def _compile(patterns):
+        if patterns is None:
+            return None
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        return re.compile('|'.join(fnmatch.translate(p) for p in patterns) or r'(?!)')
+
+    def __call__(self, group_type, name, depth=0) -> bool:
+        if depth == 0:
+            return True
+        if self.group_types is not None and group_type not in self.group_types:
+            return False
+        if self.cells is not None and group_type == 'cell':
+            return self.cells.match(name) is not None
+        return True
+
+
+# Shared read-only stand-ins for empty params/children, see <class 'LibertyGroup'>
+EMPTY_PARAMS = MappingProxyType({})
+EMPTY_CHILDREN = ()
 
 
-@dataclass
 class LibertyAttribute:
     """Simple Attribute"""
-    name: str
-    value: str
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name: str, value: str):
+        self.name = name
+        self.value = value
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.name, self.value) == (other.name, other.value)
+
+    def __repr__(self):
+        return f"{type(self).__qualname__}(name={self.name!r}, value={self.value!r})"
 
     def __hash__(self):
         return hash(repr(self))
@@ -85,7 +270,7 @@ class LibertyAttribute:
         return self.name == k
 
     def dump(self, level=0, indent_value=True, indent_separator='  '):
-        data = f"{indent(level=level, separator=indent_separator)}{self.name}: ("
+        data = f"{indent(level=level, separator=indent_separator)}{self.name} ("
         if self.name == "values" and indent_value:  # For certain attributes, indent
             data += f" \\\n{indent(level=level+1, separator=indent_separator)}\"{self.value}\" \\\n{indent(level=level, separator=indent_separator)});\n"
         else:
@@ -93,20 +278,26 @@ class LibertyAttribute:
 
         return data
 
-    @lru_cache(maxsize=1024)
     def asdict(self):
         return self.value
 
 
-@dataclass
 class ComplexLibertyAttribute:
     """
     Complex Attribute
     Such as:
         index_1 (0.1 0.2 0.3);
     """
-    name: str
-    params: List[str] = field(default_factory=list)
+    __slots__ = ('name', 'params')
+
+    def __init__(self, name: str, params: List[str] = None):
+        self.name = name
+        self.params = params if params is not None else []
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.name, self.params) == (other.name, other.params)
 
     def set_values(self, values):
         self.params = values
@@ -138,34 +329,116 @@ class ComplexLibertyAttribute:
 
         return data
 
-    @lru_cache(maxsize=1024)
     def asdict(self):
         return self.params
 
 
-@dataclass
 class LibertyGroup:
-    group_type: str
-    name: str
-    params: Dict[str, str] = field(default_factory=dict)  # Simple Attribute
-    children: List['LibertyGroup'] = field(default_factory=list)  # LibertyGroup or Complex Attribute
+    """
+    Group, such as `cell (AND2) { ... }`
+    params: Simple Attribute
+    children: LibertyGroup or Complex Attribute
+    Empty params/children are not allocated until first accessed.
+    """
+    __slots__ = ('group_type', 'name', '_params', '_children', '_index', '__weakref__')
+
+    def __init__(self, group_type: str, name: str, params: Dict[str, str] = None,
+                 children: List['LibertyGroup'] = None):
+        self.group_type = group_type
+        self.name = name
+        self._params = params  # The caller's containers are kept, even empty, only defaults are lazy
+        self._children = children
+        self._index: Optional['ChildIndex'] = None
+
+    @property
+    def params(self) -> Dict[str, str]:
+        params = self._params
+        if params is None:
+            params = self._params = {}
+        return params
+
+    @params.setter
+    def params(self, params):
+        self._params = params
+
+    @property
+    def children(self) -> List['LibertyGroup']:
+        children = self._children
+        if children is None:
+            children = self._children = []
+        return children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.group_type == other.group_type and self.name == other.name and
+                (self._params or {}) == (other._params or {}) and
+                (self._children or []) == (other._children or []))
+
+    def __repr__(self):
+        return (f"{type(self).__qualname__}(group_type={self.group_type!r}, name={self.name!r}, "
+                f"params={self._params or {}!r}, children={self._children or []!r})")
 
     def __hash__(self):
         return hash(repr(self))
 
     def dump(self, level=0, indent_value=True, indent_separator='  '):
-        data = f"{indent(level=level, separator=indent_separator)}{self.group_type} ({self.name}) {{\n"
-        for k, v in self.params.items():
-            data += f"{indent(level=level + 1, separator=indent_separator)}{k} : {v};\n"
+        return ''.join(self.iter_dump(level=level, indent_value=indent_value, indent_separator=indent_separator))
 
-        for child in self.children:
-            data += child.dump(
-                level=level + 1,
-                indent_value=indent_value,
-                indent_separator=indent_separator)
+    def iter_dump(self, level=0, indent_value=True, indent_separator='  ') -> Iterator[str]:
+        """
+        Generate Liberty text of the group in chunks, one per line or attribute.
+        Subgroups are walked with an explicit stack, so depth and size of the tree don't matter.
+        """
+        yield from self._dump_header(level, indent_separator)
+        # Stack of (iterator over children, level of children)
+        stack = [(iter(self._children or EMPTY_CHILDREN), level + 1)]
+        while stack:
+            children, level = stack[-1]
+            for child in children:
+                if isinstance(child, LibertyGroup):
+                    # Descend, the parent's iterator resumes once the subgroup is closed
+                    yield from child._dump_header(level, indent_separator)
+                    stack.append((iter(child._children or EMPTY_CHILDREN), level + 1))
+                    break
+                yield child.dump(level=level, indent_value=indent_value, indent_separator=indent_separator)
+            else:
+                stack.pop()
+                yield f"{indent(level=level - 1, separator=indent_separator)}}}\n"
 
-        data += f"{indent(level=level, separator=indent_separator)}}}\n"
-        return data
+    def _dump_header(self, level, indent_separator) -> Iterator[str]:
+        yield f"{indent(level=level, separator=indent_separator)}{self.group_type} ({self.name}) {{\n"
+        prefix = indent(level=level + 1, separator=indent_separator)
+        for k, v in (self._params or EMPTY_PARAMS).items():
+            yield f"{prefix}{k} : {v};\n"
+
+    def dump_to(self, fileobj: TextIO, level=0, indent_value=True, indent_separator='  ',
+                buffer_size=1 << 20) -> int:
+        """
+        Stream Liberty text of the group to a file opened for writing, in linear time and
+        with constant extra memory regardless of library size.
+        Such as:
+            with open('out.lib', 'w') as f:
+                library.dump_to(f)
+        :param buffer_size: Characters gathered per write() call
+        :return: Number of characters written
+        """
+        written, pending, size = 0, [], 0
+        for chunk in self.iter_dump(level=level, indent_value=indent_value, indent_separator=indent_separator):
+            pending.append(chunk)
+            size += len(chunk)
+            if size >= buffer_size:
+                fileobj.write(''.join(pending))
+                written += size
+                pending, size = [], 0
+        if pending:
+            fileobj.write(''.join(pending))
+            written += size
+        return written
 
     def match(self, k, v=None):
         if v:
@@ -178,9 +451,50 @@ class LibertyGroup:
             self.params.update({k: v})
 
     def set_child(self, child):
+        # An appended child is never the first match of a cached lookup, so the query cache stays valid
         self.children.append(child)
+        index = getattr(self, '_index', None)
+        if index is not None:
+            index.update(self.children)
+
+    def _child_index(self, verify=False) -> 'ChildIndex':
+        """
+        Index of children, built on first lookup. Children appended directly are indexed on next lookup.
+        :param verify: Also compare the children list with the one indexed, in C, to catch children
+                       replaced or removed directly. Lookups of one position check it instead.
+        """
+        index = getattr(self, '_index', None)  # Unset in subclasses building their own fields
+        children = self.children
+        if index is None or index.children is not children or index.size > len(children):
+            index = self._index = ChildIndex(children)
+        else:
+            if index.size < len(children):
+                index.update(children)
+            if verify and index.snapshot != children:
+                index = self._index = ChildIndex(children)
+        return index
+
+    def find_child(self, k, v=None):
+        """
+        First child matching (k, v) as in `match()`, or None
+        """
+        pos = self._find_position(k, v)
+        return None if pos is None else self.children[pos]
+
+    def _find_position(self, k, v=None) -> Optional[int]:
+        """
+        Position of the first child matching (k, v), or None.
+        The index is rebuilt if the position found no longer matches, or verified if none is found,
+        so children edited directly are found. A child renamed in place is only found by its new name
+        after a lookup by its old one, or `set_child()`.
+        """
+        pos = self._child_index().first(k, v)
+        if pos is None or not _child_matches(self.children[pos], k, v):
+            if pos is not None:
+                self._index = None
+            pos = self._child_index(verify=True).first(k, v)
+        return pos
 
-    @lru_cache(maxsize=1024)
     def get(self, *args, **kwargs):
         if args:
             # TODO: Support arg list later.
@@ -192,141 +506,504 @@ class LibertyGroup:
             #     return value_list
             # else:
             key = args[0]
-            if not self.params.get(key):
+            params = self._params or EMPTY_PARAMS
+            if not params.get(key):
                 # Liberty Group
-                value_list = []
-                for child in self.children:
-                    if child.match(key):
-                        value_list.append(child.get())
+                children = self.children
+                value_list = [children[i].get() for i in self._child_index(verify=True).by_key.get(key, ())]
                 return value_list[0] if len(value_list) == 1 else value_list
             else:
                 # Simple Liberty attribute
-                return self.params.get(args[0])
+                return params.get(args[0])
         if kwargs:
-            # logger.info(kwargs)
-            for child in self.children:
-                k0 = dict2list(kwargs)[0]
-                for k, v in k0.items():
-                    if child.match(k, v):
-                        # logger.debug(f"Found item with current key: {k0}")
-                        k1 = dict2list(kwargs)[1:]
-                        # logger.debug(f"Using rest of key: {list2dict(k1)}")
-                        return child.get(**list2dict(k1))
+            node = self._find_path(tuple(kwargs.items()))
+            if node is not None:
+                return node.get()
+            # Not found, the deepest match is returned as before
+            node = self
+            for k, v in kwargs.items():
+                child = node.find_child(k, v)
+                if child is None:
+                    break
+                node = child
+            return node
 
         return self
 
-    @lru_cache(maxsize=1024)
+    def _follow(self, positions, path):
+        """Node at child positions along path, or None if children were edited such that one no longer matches"""
+        node = self
+        for (k, v), pos in zip(path, positions):
+            try:
+                child = node._children[pos]
+            except (AttributeError, TypeError, IndexError):  # Not a group, no children, or fewer
+                return None
+            if isinstance(child, LibertyGroup):
+                if child.group_type != k or v and child.name != v:
+                    return None
+            elif child.name != k:
+                return None
+            node = child
+        return node
+
+    @cached_query(resolve=_follow)
+    def _find_path(self, path):
+        """
+        Node at the end of path, the keys of `get(**kwargs)`, or None if any key is not found.
+        Child positions along path are cached, only of found paths, so children appended directly are found
+        on the next lookup. Positions are followed on every lookup, so nodes replaced since are read from the tree.
+        """
+        positions = []
+        node = self
+        for k, v in path:
+            if not isinstance(node, LibertyGroup):
+                return None
+            pos = node._find_position(k, v)
+            if pos is None:
+                return None
+            positions.append(pos)
+            node = node.children[pos]
+        return tuple(positions)
+
+    def select(self, query) -> Iterator['LibertyGroup']:
+        """
+        Groups below matching a path query, lazily in document order. Unlike `get()`, names take
+        wildcards, attributes can be tested, and all matches are returned. Such as:
+            for table in library.select('cell[NAND*]/pin[direction=output]/timing[related_pin="A"]/cell_rise'):
+                ...
+        See `liberty_query.compile_query()` for the syntax.
+        """
+        from .liberty_query import select
+        return select(self, query)
+
     def asdict(self):
-        data = {}
-
-        # Group Type
-        data['type'] = self.group_type
-        data['name'] = self.name
-        # data[self.group_type] = self.name
-
-        # Simple Attributes
-        for k, v in self.params.items():
-            data[k] = v
-
-        # Complex Attributes
-        for g in self.children:
-            if isinstance(g, (LibertyAttribute, ComplexLibertyAttribute)):
-                data[g.name] = g.asdict()
-            elif isinstance(g, LibertyGroup):
-                # using special separator as values
-                if 'group' not in data.keys():
-                    data['group'] = []
-                data['group'].append(g.asdict())
-                # instance_name = f"#&#{g.group_type}#&#{g.name}"  # Use unique name as key
-                # data[instance_name] = g.asdict()
-            else:
-                raise ParseError(f"Unrecognized data type: {type(g)}")
+        """
+        Tree as nested dicts, subgroups listed under 'group'.
+        Subgroups are filled from an explicit stack, so depth of the tree doesn't matter.
+        """
+        root = {}
+        stack = [(self, root)]
+        while stack:
+            group, data = stack.pop()
+
+            # Group Type
+            data['type'] = group.group_type
+            data['name'] = group.name
+
+            # Simple Attributes
+            for k, v in (group._params or EMPTY_PARAMS).items():
+                data[k] = v
+
+            # Complex Attributes
+            for g in group._children or EMPTY_CHILDREN:
+                if isinstance(g, (LibertyAttribute, ComplexLibertyAttribute)):
+                    data[g.name] = g.asdict()
+                elif isinstance(g, LibertyGroup):
+                    # In place now, filled once popped
+                    if 'group' not in data.keys():
+                        data['group'] = []
+                    sub = {}
+                    data['group'].append(sub)
+                    stack.append((g, sub))
+                else:
+                    raise ParseError(f"Unrecognized data type: {type(g)}")
+
+        return root
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LibertyGroup':
+        """
+        Rebuild a tree from the layout of `asdict()`, such that `LibertyGroup.from_dict(d).asdict() == d`.
+        The layout doesn't tell simple from single value complex attributes, so a string is taken as
+        complex, <class 'LibertyAttribute'>, once any complex attribute or subgroup came before it,
+        or if it's a table row such as index_1, or unquoted with commas or spaces. Lists are
+        <class 'ComplexLibertyAttribute'>. Subgroups may be dicts or groups already.
+        """
+        root = cls(data['type'], data['name'])
+        stack = [(root, data)]
+        while stack:
+            group, data = stack.pop()
+            in_params = True
+            for k, v in data.items():
+                if k in ('type', 'name'):
+                    continue
+                if k == 'group' and isinstance(v, list) and all(isinstance(g, (dict, LibertyGroup)) for g in v):
+                    for sub in v:
+                        if isinstance(sub, dict):
+                            sub, sub_data = cls(sub['type'], sub['name']), sub
+                            stack.append((sub, sub_data))
+                        group.children.append(sub)
+                    in_params = False
+                elif isinstance(v, list):
+                    group.children.append(ComplexLibertyAttribute(k, [str(x) for x in v]))
+                    in_params = False
+                elif in_params and not _is_complex_value(k, v):
+                    group.params[k] = str(v)
+                else:
+                    group.children.append(LibertyAttribute(k, str(v)))
+                    in_params = False
+        return root
+
+
+def _child_matches(child, k, v) -> bool:
+    """Whether child is a match of `LibertyGroup.find_child(k, v)`"""
+    if isinstance(child, LibertyGroup):
+        return child.group_type == k and (not v or child.name == v)
+    return child.name == k
+
+
+# Attributes whose single value is a table row
+TABLE_ATTRIBUTE_NAMES = frozenset(('index_1', 'index_2', 'index_3', 'values'))
+
+
+def _is_complex_value(name, value) -> bool:
+    # Simple attribute values are single tokens or quoted strings
+    if name in TABLE_ATTRIBUTE_NAMES:
+        return True
+    return isinstance(value, str) and not value.startswith('"') and (',' in value or ' ' in value)
+
+
+def make_attribute(name, params):
+    """
+    Build attribute node from complex attribute params.
+    Single value, such as `index_1 ("0.1, 0.2");`, becomes <class 'LibertyAttribute'>.
+    """
+    if len(params) > 1:
+        return ComplexLibertyAttribute(name, params)
+    return LibertyAttribute(name, params[0] if params else "")
 
-        return data
+
+class LibertyHandler:
+    """
+    Callback interface for `LibertyParser.parse_events()`. Override what you need.
+    Such as, collecting cell area without building the tree:
+
+        class AreaHandler(LibertyHandler):
+            def __init__(self):
+                self.path, self.area = [], {}
+
+            def start_group(self, group_type, name):
+                self.path.append((group_type, name))
+
+            def end_group(self):
+                self.path.pop()
+
+            def attribute(self, name, value):
+                if name == 'area' and self.path[-1][0] == 'cell':
+                    self.area[self.path[-1][1]] = value
+
+    `self.parser.location()` gives the source span of the current event.
+    """
+    parser: Optional['LibertyParser'] = None  # Set by `LibertyParser.parse_events()`
+
+    def start_group(self, group_type, name):
+        """Group opened, such as `cell (AND2) {`"""
+        pass
+
+    def end_group(self):
+        """Group closed by `}`"""
+        pass
+
+    def attribute(self, name, value):
+        """Simple attribute, such as `area : 1;`. STRING value keeps its quotes."""
+        pass
+
+    def complex_attribute(self, name, params):
+        """Complex attribute, such as `voltage_map (VDD, 0.75);`. params is a list of values."""
+        pass
+
+
+class LibertyTreeBuilder(LibertyHandler):
+    """
+    Build <class 'LibertyGroup'> tree from parse events, keeping open groups on an explicit stack.
+    """
+    def __init__(self, table_converter=None):
+        """
+        Args:
+            table_converter: Called on each closed group, such as `lookup_table.to_lookup_table`.
+                             Its result replaces the group in the tree.
+        """
+        self.root = None
+        self.stack: List[LibertyGroup] = []
+        self.table_converter = table_converter
+
+    def start_group(self, group_type, name):
+        group = LibertyGroup(group_type, name)
+        if self.stack:
+            self.stack[-1].children.append(group)
+        else:
+            self.root = group
+        self.stack.append(group)
+
+    def end_group(self):
+        group = self.stack.pop()
+        if self.table_converter:
+            converted = self.table_converter(group)
+            if converted is not group:
+                if self.stack:
+                    self.stack[-1].children[-1] = converted
+                else:
+                    self.root = converted
+        logger.debug("Parsed Group: %s", group)
+
+    def attribute(self, name, value):
+        self.stack[-1].params[name] = value
+
+    def complex_attribute(self, name, params):
+        attr = make_attribute(name, params)
+        if self.stack:
+            self.stack[-1].children.append(attr)
+        else:
+            self.root = attr
+        logger.debug("Parsed attribute: %s", attr)
+
+
+class ChildIndex:
+    """
+    Positions of a group's children, for near constant time lookup.
+    Key is group_type for groups, and name for attributes.
+    """
+    def __init__(self, children):
+        self.children = children
+        self.snapshot = []  # Children as indexed, to catch the list edited in place
+        self.size = 0
+        self.by_key: Dict[str, List[int]] = {}
+        self.by_name: Dict[tuple, int] = {}  # (group_type, name) -> first group
+        self.first_attribute: Dict[str, int] = {}  # name -> first attribute
+        self.update(children)
+
+    def update(self, children):
+        """Index children appended since last update"""
+        for pos in range(self.size, len(children)):
+            child = children[pos]
+            if isinstance(child, LibertyGroup):
+                key = child.group_type
+                self.by_name.setdefault((key, child.name), pos)
+            else:
+                key = child.name
+                self.first_attribute.setdefault(key, pos)
+            self.by_key.setdefault(key, []).append(pos)
+        self.snapshot.extend(children[self.size:])
+        self.size = len(children)
+
+    def first(self, k, v=None) -> Optional[int]:
+        """Position of the first child matching (k, v) as in `LibertyGroup.find_child()`, or None"""
+        if v:
+            positions = [p for p in (self.by_name.get((k, v)), self.first_attribute.get(k)) if p is not None]
+            return min(positions) if positions else None
+        positions = self.by_key.get(k)
+        return positions[0] if positions else None
 
 
 class LibertyParser:
-    TOKEN_REGEX = re.compile(r"""
+    TOKEN_REGEX = re.compile(rb"""
+        (?P<tab_indent>\n[ ]*\t[ \t]*) |
+        (?P<newline>\n) |
+        (?P<comment>/\*.*?\*/ | //[^\n]* | \\[ \t\r]*\n) |
         (?P<keyword>\b(?:library|cell|pin|direction|timing|related_pin|cell_rise|values)\b) |
-        (?P<string>"[^"]*") |
+        (?P<string>"[^"\n]*") |
         (?P<number>[-+]?\d+\.?\d*) |
         (?P<symbol>[(){},:;\[\]]) |
         (?P<identifier>\w+)
-    """, re.VERBOSE)
+    """, re.VERBOSE | re.DOTALL)
+
+    TAB_SIZE = 8  # Columns between tab stops, to measure the indentation of a line
 
-    def __init__(self, file_path):
+    TOKEN_TYPES = {
+        'keyword': TokenType.KEYWORD,
+        'string': TokenType.STRING,
+        'number': TokenType.NUMBER,
+        'symbol': TokenType.SYMBOL,
+        'identifier': TokenType.IDENTIFIER,
+    }
+
+    def __init__(self, file_path, iterative=True, group_filter=None, encoding='utf-8', cache_dir=None,
+                 numeric_tables=False):
         """
         Liberty File parser
         Args:
             file_path:
+            iterative: Parse with an explicit group stack instead of recursion.
+                       Set False to use the legacy recursive descent parser.
+            group_filter: Callable (group_type, name, depth) -> bool, such as <class 'GroupFilter'>.
+                          Groups it rejects are skipped without being built.
+            encoding: File encoding
+            cache_dir: Directory of on-disk parse cache, or a <class 'ParseCache'>. Disabled by default,
+                       and ignored with group_filter, since a pruned tree is not the file content.
+            numeric_tables: Build lookup tables as <class 'lookup_table.LookupTable'>, with NumPy arrays.
         """
         self.file_path = file_path
-        self.tokens: List[LibertyToken] = []
-        self.current_token = 0
+        self.encoding = encoding
+        self.cache_dir = cache_dir
+        self.numeric_tables = numeric_tables
+        self.iterative = iterative
+        self.group_filter = group_filter
+        self.text = None
+        self.first_line = 1
+        self._stream: Optional[TokenStream] = None
+        self._statement = None  # (first token, token before it) of the statement being parsed
+
+    @classmethod
+    def from_string(cls, text, first_line=1, **kwargs) -> 'LibertyParser':
+        """
+        Parser over in-memory Liberty text, such as a single cell block.
+        :param text: Liberty source, str or bytes
+        :param first_line: Line number of the first line of text, used in ParseError
+        """
+        parser = cls(None, **kwargs)
+        parser.text = text
+        parser.first_line = first_line
+        return parser
+
+    @property
+    def current_token(self) -> int:
+        return self._stream.position if self._stream else 0
 
     def parse(self) -> LibertyGroup:
         """
         Main Parsing Function
         :return: <class 'LibertyGroup'>
         """
-        self._tokenize()
-        return self._parse_group()
-
-    def _tokenize(self):
-        is_comment = False
-        with open(self.file_path, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.split('//')[0].strip()  # Skip inline comments
+        cache = self._cache()
+        if cache:
+            tree = cache.load(self.file_path, self.encoding)
+            if tree is None:
+                # Cached trees keep tables as text, whatever numeric_tables, so every parser reads the same tree
+                tree = self._parse(numeric_tables=False)
+                try:
+                    cache.store(self.file_path, tree, self.encoding)
+                except Exception as e:  # The tree is parsed, a cache failure only costs the next parse
+                    logger.warning(f"Failed to store {self.file_path} in parse cache: {e!r}")
+            if self.numeric_tables:
+                from .lookup_table import convert_tables
+                tree = convert_tables(tree)
+            return tree
+        return self._parse(self.numeric_tables)
+
+    def _cache(self):
+        if self.cache_dir is None or self.text is not None or self.group_filter:
+            return None
+        from .parse_cache import ParseCache
+        return self.cache_dir if isinstance(self.cache_dir, ParseCache) else ParseCache(self.cache_dir)
+
+    def _parse(self, numeric_tables) -> LibertyGroup:
+        self._stream = TokenStream(self._tokenize())
+        if self.iterative:
+            return self._parse_group_iterative(numeric_tables)
+
+        tree = self._parse_group()
+        if numeric_tables:
+            from .lookup_table import convert_tables
+            tree = convert_tables(tree)
+        return tree
+
+    def parse_events(self, handler: 'LibertyHandler') -> 'LibertyHandler':
+        """
+        Event-driven parsing. Callbacks of handler are invoked while the file is read,
+        no <class 'LibertyGroup'> tree is built.
+        :param handler: <class 'LibertyHandler'>
+        :return: handler
+        """
+        self._stream = TokenStream(self._tokenize())
+        handler.parser = self
+        self._emit_events(handler)
+        return handler
 
-                # SKIP block comment
-                if is_comment:
+    def _tokenize(self) -> Iterator[LibertyToken]:
+        """
+        Generate tokens lazily over a memory-mapped file, or over self.text.
+        Tokens are consumed by parser through <class 'TokenStream'>, never materialized as a list.
+        """
+        if self.text is not None:
+            buffer = self.text if isinstance(self.text, bytes) else self.text.encode(self.encoding)
+            yield from self._tokenize_buffer(buffer, self.first_line)
+            return
+
+        with open(self.file_path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:  # Empty file can't be mapped
+                return
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield from self._tokenize_buffer(mm, self.first_line)
+            finally:
+                mm.close()
+
+    def _tokenize_buffer(self, buffer, line_num) -> Iterator[LibertyToken]:
+        """
+        Single pass of TOKEN_REGEX over bytes, comments and line continuations included.
+        Sending block depth into this generator skips the rest of the block in raw bytes,
+        see `TokenStream.skip_block()`.
+        """
+        encoding = self.encoding
+        token_types = self.TOKEN_TYPES
+        intern = sys.intern
+        pos = 0
+        line_start = 0  # Position of the current line in buffer
+        while True:
+            for match in self.TOKEN_REGEX.finditer(buffer, pos):
+                kind = match.lastgroup
+                if kind == 'newline':
+                    line_num += 1
+                    line_start = match.end()
                     continue
-
-                if line.strip().startswith('/*'):
-                    is_comment = True
-                    if line.strip().endswith('*/'):
-                        is_comment = False
+                if kind == 'tab_indent':  # Move the line start back so columns count the tabs to tab stops
+                    line_num += 1
+                    indentation = match.group()[1:]
+                    line_start = match.end() - len(indentation.expandtabs(self.TAB_SIZE))
                     continue
-
-                if line.strip().startswith('*/'):
-                    is_comment = False
+                if kind == 'comment':
+                    newlines = match.group().count(b'\n')
+                    if newlines:
+                        line_num += newlines
+                        line_start = buffer.rfind(b'\n', match.start(), match.end()) + 1
                     continue
 
-                for match in self.TOKEN_REGEX.finditer(line):
-                    groups = match.groupdict()
-                    if groups['keyword']:
-                        self.tokens.append(LibertyToken(TokenType.KEYWORD, groups['keyword'], line_num))
-                    elif groups['string']:
-                        self.tokens.append(LibertyToken(TokenType.STRING, groups['string'][1:-1], line_num))
-                    elif groups['number']:
-                        self.tokens.append(LibertyToken(TokenType.NUMBER, groups['number'], line_num))
-                    elif groups['symbol']:
-                        self.tokens.append(LibertyToken(TokenType.SYMBOL, groups['symbol'], line_num))
-                    elif groups['identifier']:
-                        self.tokens.append(LibertyToken(TokenType.IDENTIFIER, groups['identifier'], line_num))
-
-    def _parse_value(self, value=[]) -> list:
+                if kind == 'string':
+                    value = buffer[match.start() + 1:match.end() - 1].decode(encoding)
+                else:
+                    value = intern(match.group().decode(encoding))  # Names repeat all over the file
+
+                depth = yield LibertyToken(token_types[kind], value, line_num, match.start() - line_start + 1)
+                if depth:  # Skip block
+                    end = scan_block_end(buffer, match.end(), depth)
+                    newlines = buffer[match.end():end].count(b'\n')
+                    if newlines:
+                        line_num += newlines
+                        line_start = buffer.rfind(b'\n', match.end(), end) + 1
+                    pos = end
+                    break
+            else:
+                return
+
+    def _parse_value(self, value=None) -> list:
         """
         Parse Complex Attibute values with the following format:
             attribute_name (param1, [param2, param3 ...] );
-        :param value:
+        Value lists are consumed in a loop, so tables with thousands of entries never recurse.
+        :param value: Values parsed so far, starting with param1
         :return:
         """
-        self._advance()
-        self._advance()  # Skip Line break "\"
-
-        if self._peek().value == ')':
-            value.append(self._current().value)
+        value = [] if value is None else value
+        while True:
             self._advance()
-            self._consume(')')
-            self._consume(';')
-            return value
-
-        elif self._peek().value == ',':  # Value list continues
+            self._advance()  # Skip Line break "\"
             value.append(self._current().value)
-            return self._parse_value(value)
 
-    def _parse_group(self) -> LibertyGroup:
+            if self._peek().value == ')':
+                self._advance()
+                self._consume(')')
+                self._consume(';')
+                return value
+
+            if self._peek().value != ',':  # Value list continues only on ','
+                raise ParseError(f"Expected ',' or ')', got '{self._peek().value}'", self._peek().line)
+
+    def _parse_statement(self):
+        """
+        Parse statement header, such as `cell (AND2X1) {` or `index_1 ("0.1, 0.2");`
+        :return: (group_type, name, True) for groups, with '{' consumed and the body left to the caller.
+                 (attribute_name, params, False) for complex attributes, params being a list of values.
+        """
         group_type = self._current().value  # Such as "cell"
 
         self._advance()
@@ -339,14 +1016,10 @@ class LibertyParser:
             name = ""
             self._advance()
         elif self._peek().value == ',':  # Begin to parse value list
-            attr = ComplexLibertyAttribute(group_type)
-            attr.set_values(self._parse_value([self._current().value]))
-            logger.debug(f"Parsed ComplexAttribute: {attr}")
-            return attr
+            return group_type, self._parse_value([self._current().value]), False
         elif self._peek().value == '[':  # Begin to parse pin, such as ADR[8]
             self._advance()
             name += self._current().value  # Add '['
-            # logger.info(f"{self._current().value}, Next: {self._peek().value}, Peek: {self._peek()}")
             while self._peek().value != ']':
                 self._advance()
                 name += self._current().value
@@ -359,38 +1032,123 @@ class LibertyParser:
             self._advance()
             self._consume(')')
 
-        try:
-            self._consume('{')
-        except ParseError:
+        if self._current().value != '{':
             self._consume(';')
-            attr = LibertyAttribute(group_type, name)
-            logger.debug(f"Parsed attribute: {attr}")
-            return attr
+            return group_type, [name] if name else [], False
 
-        group = LibertyGroup(group_type, name)
+        self._advance()  # Skip {
+        return group_type, name, True
+
+    def _parse_simple_attribute(self):
+        """
+        Parse simple attribute `key : value;`
+        :return: (key, value)
+        """
+        key = self._current().value
+        self._advance()
+        self._consume(':')
+        value = self._current().value
+
+        # Differentiate STRING | IDENTIFIER TOKEN
+        if self._current().type == TokenType.STRING:
+            value = sys.intern(f'"{value}"')
+
+        self._advance()
+        self._consume(';')
+        return key, value
+
+    def _parse_group(self, depth=0) -> Optional[LibertyGroup]:
+        """
+        Recursive descent parser, one Python frame per nesting level.
+        :return: None if group is rejected by group_filter
+        """
+        group_type, value, is_group = self._parse_statement()
+        if not is_group:
+            return make_attribute(group_type, value)
+
+        if self.group_filter and not self.group_filter(group_type, value, depth):
+            self._stream.skip_block()
+            return None
+
+        group = LibertyGroup(group_type, value)
         while self._current().value != '}':
             if self._peek().value == '(':
                 # Group statements OR complex attributes
-                group.children.append(self._parse_group())
+                child = self._parse_group(depth + 1)
+                if child is not None:
+                    group.children.append(child)
             else:
-                key = self._current().value
-                self._advance()
-                self._consume(':')
-                value = self._current().value
-
-                # Differentiate STRING | IDENTIFIER TOKEN
-                if self._current().type == TokenType.STRING:
-                    value = f'"{value}"'
-
-                self._advance()
-                self._consume(';')
+                key, value = self._parse_simple_attribute()
                 group.params[key] = value
-                # logger.debug(f"Assign attribute - {key}: {value}")
 
         self._advance()  # Skip }
-        logger.debug(f'Parsed Group: {group}')
+        logger.debug("Parsed Group: %s", group)
         return group
 
+    def _parse_group_iterative(self, numeric_tables=False) -> LibertyGroup:
+        """
+        Non-recursive parser. Open groups are kept on the explicit stack of <class 'LibertyTreeBuilder'>.
+        Produces the same tree as `_parse_group`, regardless of nesting depth.
+        """
+        table_converter = None
+        if numeric_tables:
+            from .lookup_table import to_lookup_table as table_converter
+        builder = LibertyTreeBuilder(table_converter)
+        self._emit_events(builder)
+        return builder.root
+
+    def _emit_events(self, handler: 'LibertyHandler'):
+        """
+        Drive handler callbacks over one top-level statement, without recursion.
+        """
+        stream = self._stream
+        self._statement = (self._current(), stream.prev)
+        group_type, value, is_group = self._parse_statement()
+        if not is_group:
+            handler.complex_attribute(group_type, value)
+            return
+
+        group_filter = self.group_filter
+        if group_filter and not group_filter(group_type, value, 0):
+            stream.skip_block()
+            return
+
+        handler.start_group(group_type, value)
+        depth = 1
+        while depth:
+            # First token of the statement and the token before it, see `location()`
+            self._statement = (self._current(), stream.prev)
+            if self._statement[0].value == '}':
+                self._advance()  # Skip }
+                depth -= 1
+                handler.end_group()
+            elif self._peek().value == '(':
+                # Group statements OR complex attributes
+                group_type, value, is_group = self._parse_statement()
+                if is_group:
+                    if group_filter and not group_filter(group_type, value, depth):
+                        stream.skip_block()
+                        continue
+                    depth += 1
+                    handler.start_group(group_type, value)
+                else:
+                    handler.complex_attribute(group_type, value)
+            else:
+                handler.attribute(*self._parse_simple_attribute())
+
+    def location(self) -> Optional[Location]:
+        """
+        Span of the statement of the current parse event, for handlers of `parse_events()`.
+        For start_group it covers the header up to '{', for end_group the '}'.
+        """
+        if self._statement is None:
+            return None
+        start, before = self._statement
+        end = self._stream.prev or start
+        first_on_line = before is None or before.line != start.line
+        return Location(start.line, end.line, start.column, end.column,
+                        start.column - 1 if first_on_line else None)
+
     def _consume(self, expected):
         """
         Expect and consume the next token.
@@ -404,26 +1162,30 @@ class LibertyParser:
         self._advance()
 
     def _current(self) -> LibertyToken:
-        if self.current_token < len(self.tokens):
-            return self.tokens[self.current_token]
+        token = self._stream.current()
+        if token is not None:
+            return token
 
-        raise ParseError("Unexpected EOF", line=None)
+        raise ParseError("Unexpected EOF", line=self._stream.prev.line if self._stream.prev else None)
 
     def _advance(self) -> None:
         """
         Advance to the next token
         :return:
         """
-        self.current_token += 1
+        self._stream.advance()
 
     def _prev(self) -> Optional[LibertyToken]:
-        prev_pos = self.current_token - 1
-        return self.tokens[prev_pos] if prev_pos >= 0 else None
+        return self._stream.prev
 
-    def _peek(self) -> Optional[LibertyToken]:
+    def _peek(self) -> LibertyToken:
         """
         Peek at the next token, without moving cursor
         :return:
         """
-        next_pos = self.current_token + 1
-        return self.tokens[next_pos] if next_pos < len(self.tokens) else None
+        token = self._stream.peek()
+        if token is not None:
+            return token
+
+        last = self._stream.current() or self._stream.prev
+        raise ParseError("Unexpected EOF", line=last.line if last else None)
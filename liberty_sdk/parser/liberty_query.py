@@ -0,0 +1,275 @@
+import re
+import functools
+from logging import getLogger
+from typing import Callable, Iterator, List, Optional
+
+from .liberty_parser import LibertyGroup, EMPTY_PARAMS, EMPTY_CHILDREN
+
+logger = getLogger("main")
+
+_TYPE = re.compile(r'\s*([\w*?]+)\s*')
+_PREDICATE = re.compile(r'\s*(\w+)\s*(!=|>=|<=|=|<|>)\s*(.*?)\s*$', re.DOTALL)
+_NUMERIC_OPS = {
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+class QueryError(ValueError):
+    def __init__(self, msg, query, pos):
+        super().__init__(f"{msg} at {pos} of {query!r}")
+        self.msg = msg
+        self.query = query
+        self.pos = pos
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _pattern(text) -> Callable[[str], bool]:
+    """
+    Matcher of a value, unquoted, against text. Only `*` and `?` are wildcards,
+    so names such as ADR[0] need no escaping.
+    """
+    text = _unquote(text.strip())
+    if '*' not in text and '?' not in text:
+        return lambda value: _unquote(value) == text
+    regex = re.compile(re.escape(text).replace(r'\*', '.*').replace(r'\?', '.') + r'\Z', re.DOTALL)
+    return lambda value: regex.match(_unquote(value)) is not None
+
+
+def _split(text, sep) -> List[str]:
+    """Split on sep outside of quotes and brackets"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+class Step:
+    """
+    One step of a query, such as `pin[direction=output]`, selecting children groups,
+    or any descendant groups after `//`
+    """
+    __slots__ = ('group_type', 'type_match', 'descendant', 'tests', 'text')
+
+    def __init__(self, group_type, descendant=False, text=''):
+        if '*' in group_type or '?' in group_type:
+            self.group_type, self.type_match = None, _pattern(group_type)
+        else:
+            self.group_type, self.type_match = group_type, None
+        self.descendant = descendant
+        self.tests: List[Callable[[LibertyGroup], bool]] = []
+        self.text = text
+
+    def add_predicate(self, text, query, pos):
+        match = _PREDICATE.match(text)
+        if match is None:  # Group name
+            name = _pattern(text)
+            self.tests.append(lambda group: name(group.name))
+            return
+
+        key, op, value = match.groups()
+        if op in _NUMERIC_OPS:
+            try:
+                bound = float(_unquote(value))
+            except ValueError:
+                raise QueryError(f"{key} {op} needs a number, got {value!r}", query, pos)
+            compare = _NUMERIC_OPS[op]
+            self.tests.append(lambda group: _compare((group._params or EMPTY_PARAMS).get(key), compare, bound))
+            return
+
+        if _unquote(value) == '*':  # Defined, of any value
+            exists = op == '='
+            self.tests.append(lambda group: (key in (group._params or EMPTY_PARAMS)) is exists)
+            return
+        matcher = _pattern(value)
+        if op == '=':
+            self.tests.append(lambda group: _param_matches(group, key, matcher))
+        else:
+            self.tests.append(lambda group: not _param_matches(group, key, matcher))
+
+    def matches(self, group: LibertyGroup) -> bool:
+        if self.group_type is not None:
+            if group.group_type != self.group_type:
+                return False
+        elif not self.type_match(group.group_type):
+            return False
+        return self._test(group)
+
+    def candidates(self, group: LibertyGroup) -> Iterator[LibertyGroup]:
+        """Groups of this step below group, in document order"""
+        if self.descendant:
+            return filter(self.matches, _descendants(group))
+        if self.group_type is not None:
+            # Children of the type only, by the group's child index, verified as the list may be edited directly
+            children = group.children
+            positions = group._child_index(verify=True).by_key.get(self.group_type, ())
+            return (children[pos] for pos in positions
+                    if isinstance(children[pos], LibertyGroup) and self._test(children[pos]))
+        return (child for child in group._children or EMPTY_CHILDREN
+                if isinstance(child, LibertyGroup) and self.matches(child))
+
+    def _test(self, group):
+        for test in self.tests:
+            if not test(group):
+                return False
+        return True
+
+
+def _compare(value, compare, bound) -> bool:
+    if value is None:
+        return False
+    try:
+        return compare(float(_unquote(value)), bound)
+    except ValueError:
+        return False
+
+
+def _param_matches(group, key, matcher) -> bool:
+    value = (group._params or EMPTY_PARAMS).get(key)
+    return value is not None and matcher(value)
+
+
+def _descendants(root: LibertyGroup) -> Iterator[LibertyGroup]:
+    """Groups below root, depth first in document order"""
+    stack = [iter(root._children or EMPTY_CHILDREN)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+        elif isinstance(child, LibertyGroup):
+            yield child
+            stack.append(iter(child._children or EMPTY_CHILDREN))
+
+
+class Query:
+    """
+    Compiled path query over a group tree, see `compile_query()`
+    """
+    def __init__(self, text, steps: List[Step]):
+        self.text = text
+        self.steps = steps
+        # A descendant step after another step may reach a group twice
+        self._unique = any(step.descendant for step in steps[1:])
+
+    def __repr__(self):
+        return f"Query({self.text!r})"
+
+    def select(self, root: LibertyGroup) -> Iterator[LibertyGroup]:
+        """
+        Matching groups below root, lazily in document order
+        """
+        steps = self.steps
+        last = len(steps) - 1
+        seen = set() if self._unique else None
+        stack = [(0, steps[0].candidates(root))]
+        while stack:
+            depth, candidates = stack[-1]
+            group = next(candidates, None)
+            if group is None:
+                stack.pop()
+            elif depth < last:
+                stack.append((depth + 1, steps[depth + 1].candidates(group)))
+            elif seen is None:
+                yield group
+            elif id(group) not in seen:
+                seen.add(id(group))
+                yield group
+
+    def first(self, root: LibertyGroup) -> Optional[LibertyGroup]:
+        """First matching group, or None"""
+        return next(self.select(root), None)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(text: str) -> Query:
+    """
+    Compile a path query. Steps are separated by `/`, or `//` to match at any depth below,
+    and each step is a group type with optional predicates in brackets:
+        cell[NAND*]/pin[direction=output]/timing[related_pin="A"]/cell_rise
+        cell/bus/pin[ADR[*]]                     # Group names, `*` and `?` are wildcards
+        //timing[timing_type=setup_rising, related_pin!=CK]
+        cell[area>=2][dont_use!=*]               # Numeric compare; `!=*` means not defined
+    A bare predicate matches the group name, `key op value` a simple attribute. Values match
+    with or without quotes. Predicates in one or several brackets must all hold.
+    Compiled queries are cached, so compiling the same text again is free.
+    :return: <class 'Query'>
+    """
+    steps, pos, descendant = [], 0, False
+    if text.startswith('//'):
+        pos, descendant = 2, True
+    elif text.startswith('/'):
+        pos = 1
+    while True:
+        match = _TYPE.match(text, pos)
+        if match is None:
+            raise QueryError("Expected a group type", text, pos)
+        start, pos = pos, match.end()
+        step = Step(match.group(1), descendant)
+        while pos < len(text) and text[pos] == '[':
+            end = _closing_bracket(text, pos)
+            for predicate in _split(text[pos + 1:end], ','):
+                if not predicate.strip():
+                    raise QueryError("Empty predicate", text, pos)
+                step.add_predicate(predicate, text, pos)
+            pos = end + 1
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+        step.text = text[start:pos].strip()
+        steps.append(step)
+
+        if pos == len(text):
+            break
+        if text.startswith('//', pos):
+            pos, descendant = pos + 2, True
+        elif text[pos] == '/':
+            pos, descendant = pos + 1, False
+        else:
+            raise QueryError(f"Unexpected {text[pos]!r}", text, pos)
+    return Query(text, steps)
+
+
+def _closing_bracket(text, pos) -> int:
+    depth, quoted = 0, False
+    for i in range(pos, len(text)):
+        char = text[i]
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise QueryError("Unclosed '['", text, pos)
+
+
+def select(root: LibertyGroup, query) -> Iterator[LibertyGroup]:
+    """
+    Groups below root matching query, a text or <class 'Query'>, see `compile_query()`.
+    Such as:
+        for arc in select(library, 'cell[NAND*]/pin[direction=output]/timing[related_pin="A"]'):
+            print(arc.find_child('cell_rise', 'delay_temp_3x3'))
+    """
+    if isinstance(query, str):
+        query = compile_query(query)
+    return query.select(root)
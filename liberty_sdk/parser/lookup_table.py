@@ -0,0 +1,286 @@
+from logging import getLogger
+from typing import List, Optional
+
+import numpy as np
+
+from .liberty_parser import LibertyGroup, LibertyAttribute, ComplexLibertyAttribute
+
+logger = getLogger("main")
+
+INDEX_NAMES = ('index_1', 'index_2', 'index_3')
+
+
+def format_row(row) -> str:
+    """
+    Format floats as Liberty table row, such as "0.1, 0.2, 0.3".
+    repr() of float is the shortest string that reads back to the same value, so no precision is lost.
+    """
+    return ', '.join(map(repr, row.tolist()))
+
+
+def parse_rows(rows: List[str]) -> np.ndarray:
+    """
+    Parse Liberty table rows into a 2-D float64 array, one row per string
+    """
+    if len({row.count(',') for row in rows}) > 1:
+        raise ValueError("Rows of different length")
+    flat = np.array(','.join(rows).split(','), dtype=np.float64)
+    return flat.reshape(len(rows), -1)
+
+
+class ArrayAttribute(LibertyAttribute):
+    """
+    Single row table attribute, such as `index_1 ("0.5, 1.0, 1.5");`, backed by a float64 array.
+    `value` is formatted from the array on access. The array is 1 x N for values of a 2-D table of one row.
+    """
+    __slots__ = ('array',)
+
+    def __init__(self, name, array: np.ndarray):
+        self.name = name
+        self.array = array
+
+    @property
+    def value(self) -> str:
+        return format_row(self.array.ravel())
+
+    @value.setter
+    def value(self, value):
+        self.array = parse_rows([value]).reshape((1,) * (self.array.ndim - 1) + (-1,))
+
+
+class ComplexArrayAttribute(ComplexLibertyAttribute):
+    """
+    Multi row table attribute, such as `values ("0.1, 0.2", "0.3, 0.4");`, backed by a float64 array.
+    3-D values are kept as (index_1, index_2, index_3) and written as len(index_1) * len(index_2) rows.
+    """
+    __slots__ = ('array',)
+
+    def __init__(self, name, array: np.ndarray):
+        self.name = name
+        self.array = array
+
+    @property
+    def params(self) -> List[str]:
+        return [format_row(row) for row in self.array.reshape(-1, self.array.shape[-1])]
+
+    @params.setter
+    def params(self, values):
+        self.array = parse_rows(values)
+
+
+class LookupTable(LibertyGroup):
+    """
+    Lookup table group, such as cell_rise or rise_power, with float64 index vectors and values array.
+    Index vectors missing from the table itself come from its lu_table_template.
+    """
+    __slots__ = ()
+
+    def _array_attribute(self, name):
+        child = self.find_child(name)
+        return child if isinstance(child, (ArrayAttribute, ComplexArrayAttribute)) else None
+
+    def index(self, n) -> Optional[np.ndarray]:
+        """
+        :param n: 1, 2 or 3
+        :return: index_<n> vector, or None if the table doesn't define it
+        """
+        attr = self._array_attribute(f'index_{n}')
+        return attr.array if attr is not None else None
+
+    @property
+    def index_1(self) -> Optional[np.ndarray]:
+        return self.index(1)
+
+    @property
+    def index_2(self) -> Optional[np.ndarray]:
+        return self.index(2)
+
+    @property
+    def index_3(self) -> Optional[np.ndarray]:
+        return self.index(3)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._array_attribute('values').array
+
+    @values.setter
+    def values(self, array):
+        self._array_attribute('values').array = np.asarray(array, dtype=np.float64)
+
+    def lookup(self, slew, load=None, template: LibertyGroup = None):
+        """
+        Interpolate at (slew, load), see `lookup()`
+        """
+        return lookup(self, slew, load, template)
+
+
+def to_lookup_table(group: LibertyGroup) -> LibertyGroup:
+    """
+    Convert a group holding a `values` attribute into <class 'LookupTable'>.
+    Groups with non-numeric tables are returned unchanged.
+    """
+    if isinstance(group, LookupTable):
+        return group
+
+    indexes, values_pos = {}, None
+    for pos, child in enumerate(group.children):
+        if isinstance(child, LibertyGroup):
+            continue
+        if child.name in INDEX_NAMES:
+            indexes[child.name] = pos
+        elif child.name == 'values':
+            values_pos = pos
+    if values_pos is None:
+        return group
+
+    children = list(group.children)
+    try:
+        shape = []
+        for name in INDEX_NAMES:
+            if name in indexes:
+                array = parse_rows(_rows(children[indexes[name]])).ravel()
+                children[indexes[name]] = ArrayAttribute(name, array)
+                shape.append(len(array))
+
+        values = parse_rows(_rows(children[values_pos]))
+    except ValueError:
+        logger.debug("Skip non-numeric table %s (%s)", group.group_type, group.name)
+        return group
+
+    if len(shape) == 3 and values.size == np.prod(shape):
+        values = values.reshape(shape)
+    elif len(values) == 1 and len(shape) <= 1:
+        values = values[0]
+    # Same attribute type as the text, so get() returns the same type
+    if isinstance(group.children[values_pos], ComplexLibertyAttribute):
+        children[values_pos] = ComplexArrayAttribute('values', values)
+    else:
+        children[values_pos] = ArrayAttribute('values', values)
+
+    return LookupTable(group.group_type, group.name, group.params, children)
+
+
+def _rows(attr) -> List[str]:
+    return attr.params if isinstance(attr, ComplexLibertyAttribute) else [attr.value]
+
+
+def convert_tables(root: LibertyGroup) -> LibertyGroup:
+    """
+    Convert every lookup table under root in place, see `to_lookup_table()`
+    :return: root, converted as well if it's a table itself
+    """
+    stack = [root]
+    while stack:
+        group = stack.pop()
+        for pos, child in enumerate(group.children):
+            if isinstance(child, LibertyGroup):
+                table = to_lookup_table(child)
+                group.children[pos] = table
+                stack.append(table)
+    return to_lookup_table(root)
+
+
+# Template variables of load, other variables are taken as slew
+LOAD_VARIABLES = {
+    'total_output_net_capacitance', 'output_net_length', 'output_net_wire_cap', 'output_net_pin_cap',
+    'related_out_total_output_net_capacitance',
+}
+TEMPLATE_TYPES = (
+    'lu_table_template', 'power_lut_template', 'ocv_table_template', 'output_current_template',
+    'maxcap_lut_template', 'maxtrans_lut_template', 'compact_lut_template',
+)
+
+
+def find_template(library: LibertyGroup, name) -> Optional[LibertyGroup]:
+    """
+    Find table template by name, such as `lu_table_template (delay_temp_3x3)`
+    """
+    for template_type in TEMPLATE_TYPES:
+        template = library.find_child(template_type, name)
+        if isinstance(template, LibertyGroup):
+            return template
+    return None
+
+
+def _axes(table: LookupTable, template: Optional[LibertyGroup]):
+    """
+    :return: [(index vector, 'slew' | 'load')], one per table dimension
+    """
+    indexes = []
+    for n in range(1, table.values.ndim + 1):
+        index = table.index(n)
+        if index is None and template is not None and template.find_child(f'index_{n}') is not None:
+            index = parse_rows(_rows(template.find_child(f'index_{n}'))).ravel()
+        if index is None:
+            raise ValueError(f"Table {table.group_type} ({table.name}) has no index_{n}")
+        indexes.append(index)
+    if table.values.shape != tuple(len(index) for index in indexes):
+        raise ValueError(f"Table {table.group_type} ({table.name}) of shape {table.values.shape} "
+                         f"doesn't match its index")
+
+    variables = [template.params.get(f'variable_{n}') if template is not None else None
+                 for n in range(1, len(indexes) + 1)]
+    # Load axis by template variable, remaining axes take slew, then load
+    kinds = [None] * len(indexes)
+    for i, variable in enumerate(variables):
+        if variable in LOAD_VARIABLES:
+            kinds[i] = 'load'
+            break
+    remaining = [kind for kind in ('slew', 'load') if kind not in kinds]
+    for i in range(len(kinds)):
+        if kinds[i] is None:
+            kinds[i] = remaining.pop(0)
+    return list(zip(indexes, kinds))
+
+
+def _bracket(index: np.ndarray, x: np.ndarray):
+    """
+    Lower/upper positions in index and weight of upper, for linear interpolation.
+    Points out of range get a weight out of [0, 1], which extrapolates from the nearest segment.
+    """
+    if len(index) == 1:
+        zeros = np.zeros(x.shape, dtype=np.intp)
+        return zeros, zeros, np.zeros(x.shape)
+    lower = np.clip(np.searchsorted(index, x, side='right') - 1, 0, len(index) - 2)
+    upper = lower + 1
+    weight = (x - index[lower]) / (index[upper] - index[lower])
+    return lower, upper, weight
+
+
+def lookup(table: LibertyGroup, slew, load=None, template: LibertyGroup = None):
+    """
+    Evaluate NLDM table at (slew, load) by bilinear interpolation, extrapolating linearly out of range.
+    Slew and load accept scalars or NumPy arrays of query points, broadcast against each other.
+    :param table: Table group, such as cell_rise under timing(), or rise_power under internal_power()
+    :param slew: Input transition
+    :param load: Output load, omit for 1-D tables indexed by slew only
+    :param template: lu_table_template of the table, or the library to find it in.
+                     Decides which index holds slew and which holds load. By default index_1 is slew.
+    :return: float, or array in the broadcast shape of slew and load
+    """
+    table = to_lookup_table(table)
+    if not isinstance(table, LookupTable):
+        raise ValueError(f"{table.group_type} ({table.name}) is not a numeric lookup table")
+    if template is not None and template.group_type not in TEMPLATE_TYPES:
+        template = find_template(template, table.name)
+
+    axes = _axes(table, template)
+    points = {'slew': slew, 'load': load}
+    if any(points[kind] is None for _, kind in axes):
+        raise ValueError(f"Table {table.group_type} ({table.name}) needs {[kind for _, kind in axes]}")
+
+    coords = np.broadcast_arrays(*[np.asarray(points[kind], dtype=np.float64) for _, kind in axes])
+    values = table.values
+    if len(axes) == 1:
+        lower, upper, t = _bracket(axes[0][0], coords[0])
+        values = values.ravel()
+        result = values[lower] * (1 - t) + values[upper] * t
+    elif len(axes) == 2:
+        i0, i1, t = _bracket(axes[0][0], coords[0])
+        j0, j1, u = _bracket(axes[1][0], coords[1])
+        result = (values[i0, j0] * (1 - t) * (1 - u) + values[i0, j1] * (1 - t) * u +
+                  values[i1, j0] * t * (1 - u) + values[i1, j1] * t * u)
+    else:
+        raise ValueError(f"Table {table.group_type} ({table.name}) has {len(axes)} dimensions, up to 2 supported")
+
+    return float(result) if result.ndim == 0 else result
@@ -0,0 +1,190 @@
+import fnmatch
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .liberty_parser import LibertyGroup, EMPTY_CHILDREN
+from .lookup_table import LookupTable, to_lookup_table
+from .liberty_diff import KEY_PARAMS, segment
+
+logger = getLogger("main")
+
+Path = Tuple[str, ...]
+
+
+def collect_tables(library: LibertyGroup, key_params=KEY_PARAMS) -> Dict[Path, LookupTable]:
+    """
+    Numeric tables of a library keyed by path below the library, such as
+    ('cell (AND2)', 'pin (o)', 'timing (related_pin="A")', 'cell_rise (delay_temp_3x3)').
+    Templates are skipped, they have no values.
+    """
+    tables = {}
+    stack = [(library, ())]
+    while stack:
+        group, path = stack.pop()
+        for child in group._children or EMPTY_CHILDREN:
+            if not isinstance(child, LibertyGroup):
+                continue
+            child_path = path + (segment(child, key_params),)
+            table = to_lookup_table(child)
+            if isinstance(table, LookupTable):
+                if child_path in tables:
+                    logger.warning("Table %s is defined twice, the first one is kept", '/'.join(child_path))
+                else:
+                    tables[child_path] = table
+            else:
+                stack.append((child, child_path))
+    return tables
+
+
+@dataclass
+class CornerTable:
+    """The same table in every corner, stacked along the first axis"""
+    path: Path
+    corners: List[str]
+    values: np.ndarray  # (corner, index_1[, index_2]), NaN for corners without the table
+    index_1: Optional[np.ndarray] = None  # (corner, len(index_1)), NaN rows for missing corners
+    index_2: Optional[np.ndarray] = None
+
+    @property
+    def same_index(self) -> bool:
+        """Whether all corners share index vectors, so values can be compared point by point"""
+        for index in (self.index_1, self.index_2):
+            if index is not None and len(index) > 1:
+                rows = index[~np.isnan(index).any(axis=1)]
+                if len(rows) and not (rows == rows[0]).all():
+                    return False
+        return True
+
+    def max(self) -> np.ndarray:
+        """Worst case over corners, point by point"""
+        return np.nanmax(self.values, axis=0)
+
+    def min(self) -> np.ndarray:
+        return np.nanmin(self.values, axis=0)
+
+    def sensitivity(self, reference=0) -> np.ndarray:
+        """Relative change of every corner against the reference corner, (value - ref) / ref"""
+        ref = self.values[reference]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.values - ref) / ref
+
+
+class MultiCorner:
+    """
+    Libraries of several corners aligned by table path, so a table is one (corner, index_1, index_2) array.
+    Such as:
+        corners = MultiCorner({'ss': ss_lib, 'tt': tt_lib, 'ff': ff_lib})
+        worst = corners.table('cell (AND2)/pin (o)/timing (*"A"*)/cell_rise (*)').max()
+        paths, delays = corners.stack_all('cell_rise')  # (table, corner, index_1, index_2)
+        worst_per_arc = np.nanmax(delays, axis=(1, 2, 3))
+    """
+    def __init__(self, libraries: Union[Dict[str, LibertyGroup], Sequence[LibertyGroup]], key_params=KEY_PARAMS):
+        """
+        Args:
+            libraries: {corner name: library}, or libraries named by their own name
+            key_params: Params telling apart unnamed groups such as timing (), see `liberty_diff.KEY_PARAMS`
+        """
+        if not isinstance(libraries, dict):
+            libraries = {library.name: library for library in libraries}
+        self.corners = list(libraries)
+        self.libraries = libraries
+        self._tables = [collect_tables(library, key_params) for library in libraries.values()]
+
+        # Paths in order of first appearance over corners
+        self.paths: List[Path] = list(dict.fromkeys(path for tables in self._tables for path in tables))
+        logger.info(f"Aligned {len(self.paths)} tables over {len(self.corners)} corners")
+
+    def __len__(self):
+        return len(self.paths)
+
+    def find(self, pattern) -> List[Path]:
+        """Paths matching a glob pattern over '/'-joined segments, such as `cell (AND2)/*/cell_rise (*)`"""
+        return [path for path in self.paths if fnmatch.fnmatchcase('/'.join(path), pattern)]
+
+    def missing(self) -> Dict[Path, List[str]]:
+        """Tables absent from some corners, with the corners lacking them"""
+        result = {}
+        for path in self.paths:
+            corners = [corner for corner, tables in zip(self.corners, self._tables) if path not in tables]
+            if corners:
+                result[path] = corners
+        return result
+
+    def _resolve(self, path) -> Path:
+        if isinstance(path, tuple):
+            return path
+        if path in ('', None):
+            raise KeyError(path)
+        matches = self.find(path)
+        if len(matches) != 1:
+            raise KeyError(f"{path} matches {len(matches)} tables")
+        return matches[0]
+
+    def table(self, path: Union[Path, str]) -> CornerTable:
+        """
+        Stack one table over corners
+        :param path: Path tuple, or a glob pattern matching exactly one path
+        """
+        path = self._resolve(path)
+        present = [tables.get(path) for tables in self._tables]
+        shapes = {table.values.shape for table in present if table is not None}
+        if not shapes:
+            raise KeyError(path)
+        if len(shapes) > 1:
+            raise ValueError(f"Table {'/'.join(path)} differs in shape over corners: {sorted(shapes)}")
+        shape = shapes.pop()
+
+        values = np.full((len(present),) + shape, np.nan)
+        for i, table in enumerate(present):
+            if table is not None:
+                values[i] = table.values
+        indexes = []
+        for n in (1, 2):
+            vectors = [table.index(n) if table is not None else None for table in present]
+            lengths = {len(v) for v in vectors if v is not None}
+            if len(lengths) != 1:
+                indexes.append(None)
+                continue
+            index = np.full((len(present), lengths.pop()), np.nan)
+            for i, vector in enumerate(vectors):
+                if vector is not None:
+                    index[i] = vector
+            indexes.append(index)
+        return CornerTable(path, self.corners, values, *indexes)
+
+    def stack_all(self, group_type=None, shape=None) -> Tuple[List[Path], np.ndarray]:
+        """
+        Stack every table of group_type, such as cell_rise, present in all corners with one shape,
+        into a single (table, corner, index_1[, index_2]) array for whole library reductions.
+        :param shape: Shape of tables to take, default to the most common one
+        :return: Paths of the tables, in array order, and the array
+        """
+        candidates = {}
+        for path in self.paths:
+            if group_type is not None and not path[-1].startswith(f"{group_type} ("):
+                continue
+            tables = [tables.get(path) for tables in self._tables]
+            if any(table is None for table in tables):
+                continue
+            shapes = {table.values.shape for table in tables}
+            if len(shapes) == 1:
+                candidates[path] = (shapes.pop(), tables)
+
+        if shape is None:
+            counts = {}
+            for table_shape, _ in candidates.values():
+                counts[table_shape] = counts.get(table_shape, 0) + 1
+            if not counts:
+                return [], np.empty((0, len(self.corners)))
+            shape = max(counts, key=counts.get)
+        shape = tuple(shape)
+
+        paths = [path for path, (table_shape, _) in candidates.items() if table_shape == shape]
+        result = np.empty((len(paths), len(self.corners)) + shape)
+        for i, path in enumerate(paths):
+            for j, table in enumerate(candidates[path][1]):
+                result[i, j] = table.values
+        return paths, result
@@ -0,0 +1,175 @@
+import os
+import mmap
+import time
+from logging import getLogger
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .liberty_parser import LibertyParser, LibertyGroup, ParseError
+from .lazy_library import LazyLibrary, LazyCell, CellIndex
+
+logger = getLogger("main")
+
+CHUNKS_PER_WORKER = 4  # More chunks than workers, to balance cells of different size
+
+
+def _parse_cells(file_path, encoding, spans: List[Tuple[int, int, int]]) -> List[LibertyGroup]:
+    """
+    Worker: parse cell blocks given as (offset, length, line) from file_path
+    """
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return [
+                LibertyParser.from_string(mm[offset:offset + length], first_line=line, encoding=encoding).parse()
+                for offset, length, line in spans
+            ]
+        finally:
+            mm.close()
+
+
+def split_cells(cells: List[CellIndex], chunks) -> List[List[CellIndex]]:
+    """
+    Split cells in file order into contiguous chunks of roughly equal byte size
+    """
+    total = sum(cell.length for cell in cells)
+    target = max(total // max(chunks, 1), 1)
+
+    result, current, size = [], [], 0
+    for cell in cells:
+        current.append(cell)
+        size += cell.length
+        if size >= target:
+            result.append(current)
+            current, size = [], 0
+    if current:
+        result.append(current)
+    return result
+
+
+def parse_parallel(file_path, workers=None, encoding='utf-8') -> LibertyGroup:
+    """
+    Parse a single library with a process pool, cells being split among workers by byte range.
+    The result is the same tree as `LibertyParser(file_path).parse()`.
+    :param file_path: Liberty file
+    :param workers: Number of processes, default to CPU count
+    :param encoding: File encoding
+    :return: <class 'LibertyGroup'>
+    """
+    workers = workers or os.cpu_count() or 1
+    with LazyLibrary(file_path, encoding=encoding) as lazy:
+        root = lazy.root
+        cells = list(lazy.cells)
+
+    chunks = split_cells(cells, workers * CHUNKS_PER_WORKER)
+    logger.info(f"Parsing {len(cells)} cells of {file_path} in {len(chunks)} chunks, {workers} workers")
+
+    spans = [[(cell.offset, cell.length, cell.line) for cell in chunk] for chunk in chunks]
+    if workers == 1 or len(chunks) <= 1:
+        parsed = [_parse_cells(file_path, encoding, span) for span in spans]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(_parse_cells, [file_path] * len(spans), [encoding] * len(spans), spans))
+
+    # Merge under library header, each placeholder replaced by the group parsed from its own block
+    groups = {id(cell): group for chunk, groups in zip(chunks, parsed) for cell, group in zip(chunk, groups)}
+    for i, child in enumerate(root.children):
+        if isinstance(child, LazyCell):
+            group = groups.pop(id(child._cell_index), None)
+            if group is None or group.name != child.name:
+                raise ParseError(f"Cell {child.name} of the library header has no parsed block",
+                                 child._cell_index.line)
+            root.children[i] = group
+    if groups:
+        raise ParseError(f"{len(groups)} parsed cells are not in the library header")
+    return root
+
+
+@dataclass
+class ParseResult:
+    """Outcome of parsing one file in `parse_many`"""
+    path: str
+    library: Optional[LibertyGroup] = None
+    error: Optional[Exception] = None  # Such as ParseError, with line number
+    elapsed: float = 0.0  # Seconds
+    size: int = 0  # Bytes
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def throughput(self) -> float:
+        """MB/s"""
+        return self.size / 1e6 / self.elapsed if self.elapsed else 0.0
+
+
+def _parse_file(path, parser_kwargs) -> ParseResult:
+    """
+    Worker: parse one library, errors are returned rather than raised
+    """
+    start = time.perf_counter()
+    result = ParseResult(path)
+    try:
+        result.size = os.path.getsize(path)
+        result.library = LibertyParser(path, **parser_kwargs).parse()
+    except Exception as e:
+        result.error = e
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def iter_parse_many(paths: Iterable[str], workers=None, **parser_kwargs) -> Iterator[ParseResult]:
+    """
+    Parse many libraries, such as PVT corners, concurrently in a process pool.
+    Results are yielded as soon as each file is done, failures included.
+    :param paths: Liberty files
+    :param workers: Number of processes, default to CPU count
+    :param parser_kwargs: Passed to <class 'LibertyParser'>, such as group_filter
+    """
+    paths = list(paths)
+    workers = min(workers or os.cpu_count() or 1, max(len(paths), 1))
+    if workers == 1:
+        for path in paths:
+            yield _parse_file(path, parser_kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_parse_file, path, parser_kwargs): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:  # Worker died, such as BrokenProcessPool, or arguments can't be pickled
+                result = ParseResult(futures[future], error=e)
+            yield result
+
+
+def parse_many(paths: Iterable[str], workers=None, progress: Callable[[ParseResult], None] = None,
+               **parser_kwargs) -> Dict[str, Union[LibertyGroup, Exception]]:
+    """
+    Parse many libraries concurrently, one failure doesn't stop the batch.
+    :param paths: Liberty files
+    :param workers: Number of processes, default to CPU count
+    :param progress: Called with each <class 'ParseResult'> as it finishes
+    :param parser_kwargs: Passed to <class 'LibertyParser'>
+    :return: {path: LibertyGroup}, in order of paths. Failed path maps to its exception.
+    """
+    paths = list(paths)
+    results = {}
+    start = time.perf_counter()
+    for i, result in enumerate(iter_parse_many(paths, workers=workers, **parser_kwargs), 1):
+        if result.ok:
+            logger.info(f"[{i}/{len(paths)}] Parsed {result.path} in {result.elapsed:.2f}s "
+                        f"({result.throughput:.1f} MB/s)")
+            results[result.path] = result.library
+        else:
+            logger.error(f"[{i}/{len(paths)}] Failed to parse {result.path}: {result.error}")
+            results[result.path] = result.error
+        if progress:
+            progress(result)
+
+    elapsed = time.perf_counter() - start
+    failed = sum(isinstance(v, Exception) for v in results.values())
+    logger.info(f"Parsed {len(paths) - failed}/{len(paths)} libraries in {elapsed:.2f}s")
+    return {path: results[path] for path in paths}
@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import pickle
+import hashlib
+from logging import getLogger
+from typing import Optional
+
+from .liberty_parser import LibertyGroup, LibertyAttribute, ComplexLibertyAttribute, ParseError
+
+logger = getLogger("main")
+
+CACHE_VERSION = 2  # Bump when tree encoding changes
+
+# Node markers of encoded tree
+GROUP, ATTRIBUTE, COMPLEX_ATTRIBUTE = 0, 1, 2
+
+
+def encode_tree(root) -> list:
+    """
+    Encode tree into a flat list of plain tuples in pre-order, compact and fast to pickle.
+    A group is followed by its children, which it counts, so depth costs no recursion.
+    """
+    encoded = []
+    stack = [iter((root,))]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+        elif isinstance(node, LibertyGroup):
+            children = node._children or ()
+            encoded.append((GROUP, node.group_type, node.name, node.params, len(children)))
+            stack.append(iter(children))
+        elif isinstance(node, LibertyAttribute):
+            encoded.append((ATTRIBUTE, node.name, node.value))
+        elif isinstance(node, ComplexLibertyAttribute):
+            encoded.append((COMPLEX_ATTRIBUTE, node.name, node.params))
+        else:
+            raise ParseError(f"Unrecognized data type: {type(node)}")
+    return encoded
+
+
+def decode_tree(encoded: list):
+    """Tree of a list from `encode_tree()`"""
+    root = None
+    stack = []  # [children list, children left] per open group
+    for data in encoded:
+        kind = data[0]
+        if kind == GROUP:
+            node = LibertyGroup(data[1], data[2], data[3] or None, [] if data[4] else None)
+        elif kind == ATTRIBUTE:
+            node = LibertyAttribute(data[1], data[2])
+        else:
+            node = ComplexLibertyAttribute(data[1], data[2])
+
+        if stack:
+            frame = stack[-1]
+            frame[0].append(node)
+            frame[1] -= 1
+            if frame[1] == 0:
+                stack.pop()
+        else:
+            root = node
+        if kind == GROUP and data[4]:
+            stack.append([node.children, data[4]])
+    return root
+
+
+def file_digest(file_path, chunk_size=1 << 24) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed libraries, keyed by file path.
+    An entry is valid while file size and mtime are unchanged. If only mtime changed,
+    content hash decides, so touched but unchanged files still hit.
+    Least recently used entries are evicted beyond max_bytes or max_entries.
+    """
+    def __init__(self, cache_dir, max_bytes=8 * 1024 ** 3, max_entries=256):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry(self, file_path, encoding='utf-8'):
+        key = hashlib.sha1(
+            f"{os.path.abspath(file_path)}|{encoding}|{CACHE_VERSION}|{sys.version_info[:2]}".encode()
+        ).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.bin"
+
+    def load(self, file_path, encoding='utf-8') -> Optional[LibertyGroup]:
+        meta_path, data_path = self._entry(file_path, encoding)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            stat = os.stat(file_path)
+            if stat.st_size != meta['size']:
+                return None
+            if stat.st_mtime_ns != meta['mtime_ns']:
+                if file_digest(file_path) != meta['digest']:
+                    return None
+                meta['mtime_ns'] = stat.st_mtime_ns
+                self._write(meta_path, json.dumps(meta).encode())
+
+            with open(data_path, 'rb') as f:
+                tree = decode_tree(pickle.load(f))
+        except (OSError, ValueError, KeyError, IndexError, EOFError, pickle.UnpicklingError):
+            return None
+
+        os.utime(meta_path)  # Mark as recently used
+        logger.info(f"Loaded {file_path} from parse cache")
+        return tree
+
+    def store(self, file_path, tree, encoding='utf-8'):
+        meta_path, data_path = self._entry(file_path, encoding)
+        stat = os.stat(file_path)
+        meta = {
+            'path': os.path.abspath(file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'digest': file_digest(file_path),
+        }
+        self._write(data_path, pickle.dumps(encode_tree(tree), protocol=pickle.HIGHEST_PROTOCOL))
+        self._write(meta_path, json.dumps(meta).encode())
+        self.evict()
+
+    @staticmethod
+    def _write(path, data):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits max_bytes and max_entries
+        """
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.cache_dir, file_name)
+            data_path = meta_path[:-len('.json')] + '.bin'
+            try:
+                size = os.path.getsize(data_path) + os.path.getsize(meta_path)
+                entries.append((os.path.getmtime(meta_path), size, meta_path, data_path))
+            except OSError:
+                continue
+
+        entries.sort()
+        total = sum(entry[1] for entry in entries)
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            _, size, meta_path, data_path = entries.pop(0)
+            for path in (meta_path, data_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            logger.debug("Evicted parse cache entry %s", meta_path)
+
+    def clear(self):
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(('.json', '.bin')):
+                os.remove(os.path.join(self.cache_dir, file_name))
@@ -0,0 +1,95 @@
+import weakref
+import functools
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results on tree nodes, such as the child positions found by `LibertyGroup.get`.
+    Entries are keyed by node identity and hold the node by weak reference, so a tree is released
+    as soon as it's unused, and its entries with it. Results are held strongly, so results that are the
+    node itself are not cached, nor are None results, which would go stale as children are appended.
+    Queries may resolve cached results against the tree on every call, `LibertyGroup.get` does, so trees
+    edited directly need no `invalidate()`.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (weakref of node, result)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def resize(self, maxsize):
+        """Change capacity, 0 disables the cache"""
+        self.maxsize = maxsize
+        while len(self._entries) > maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def clear(self):
+        self.invalidate()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def call(self, method, node, args, kwargs, resolve=None):
+        """
+        Return cached result of method(node, *args, **kwargs), computing it on miss
+        :param resolve: Callable (node, result, *args) -> returned value, None if a cached result went stale
+        """
+        key = (id(node), method.__name__, args, tuple(kwargs.items())) if self.maxsize else None
+        try:
+            entry = self._entries.get(key)
+        except TypeError:  # Unhashable arguments
+            entry = key = None
+
+        if entry is not None and entry[0]() is node:
+            result = entry[1] if resolve is None else resolve(node, entry[1], *args)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        if key is not None:
+            self.misses += 1
+        result = method(node, *args, **kwargs)
+        if result is None or result is node:
+            return result
+        if key is not None:
+            self._entries[key] = (weakref.ref(node, self._discard(key)), result)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result if resolve is None else resolve(node, result, *args)
+
+    def _discard(self, key):
+        entries = weakref.ref(self._entries)
+
+        def callback(_):
+            # Node is garbage collected, drop its entry
+            live = entries()
+            if live is not None:
+                live.pop(key, None)
+        return callback
+
+
+# Shared by all trees
+query_cache = QueryCache()
+
+
+def cached_query(method=None, resolve=None):
+    """
+    Cache results of a node method in `query_cache`, used as `@cached_query` or `@cached_query(resolve=...)`
+    :param resolve: Callable (node, result, *args) -> returned value, None if a cached result went stale
+    """
+    if method is None:
+        return functools.partial(cached_query, resolve=resolve)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return query_cache.call(method, self, args, kwargs, resolve)
+    return wrapper
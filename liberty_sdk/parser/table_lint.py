@@ -0,0 +1,253 @@
+from collections import defaultdict
+from logging import getLogger
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .liberty_linter import LintRule
+from .liberty_diff import KEY_PARAMS
+from .lookup_table import INDEX_NAMES, LOAD_VARIABLES, TEMPLATE_TYPES
+
+logger = getLogger("main")
+
+# Tables that must be non-negative and grow with load
+DELAY_TYPES = ('cell_rise', 'cell_fall', 'rise_transition', 'fall_transition')
+POWER_TYPES = ('rise_power', 'fall_power', 'power')
+
+
+class _Table:
+    """A lookup table seen during the parse, kept as text until `TableSanityRule.finish()`"""
+    __slots__ = ('group_type', 'template', 'path', 'loc', 'indexes', 'rows', 'values')
+
+    def __init__(self, group_type, template, path, loc, indexes, rows):
+        self.group_type = group_type
+        self.template = template
+        self.path = path
+        self.loc = loc
+        self.indexes = indexes  # {n: row text}
+        self.rows = rows  # Row texts of values
+        self.values: Optional[np.ndarray] = None
+
+
+def _parse_batch(texts: List[str]) -> List[Optional[np.ndarray]]:
+    """
+    Parse comma separated numbers of many strings in one NumPy call.
+    :return: A float64 vector per string, None for strings that are not numeric
+    """
+    if not texts:
+        return []
+    counts = [text.count(',') + 1 for text in texts]
+    try:
+        flat = np.array(','.join(texts).split(','), dtype=np.float64)
+    except ValueError:  # Find the bad ones
+        return [_parse_one(text) for text in texts]
+    return np.split(flat, np.cumsum(counts)[:-1])
+
+
+def _parse_one(text) -> Optional[np.ndarray]:
+    try:
+        return np.array(text.split(','), dtype=np.float64)
+    except ValueError:
+        return None
+
+
+def _position(mask) -> tuple:
+    """Position of the first True in mask"""
+    return tuple(int(i) for i in np.unravel_index(int(np.argmax(mask)), mask.shape))
+
+
+class TableSanityRule(LintRule):
+    """
+    Check every lookup table against its template once the file is parsed, batched by table shape:
+        E501  values don't match the index vectors of the table or its template, or aren't numeric
+        W502  template not defined in the library
+        E503  NaN or infinite values
+        E504  negative delay or transition, W504 negative power
+        W505  delay or transition decreasing with load
+        W506  single point spike, a local extremum along every axis far from its neighbours
+        E507  index vector not strictly increasing
+    Tables are kept as text during the parse and converted in one call, so checking every table of a
+    large library takes seconds. Such as:
+        linter = LibertyLinter('big.lib', rules=DEFAULT_RULES + TABLE_RULES)
+    """
+    code = "E501"
+    level = "error"
+
+    monotonic_tolerance = 1e-6  # Drop along load tolerated, relative to the largest value of the table
+    spike_ratio = 0.5  # Spike if |value - mean of neighbours| > spike_ratio * larger neighbour
+
+    def __init__(self, linter):
+        super().__init__(linter)
+        self.frames = []  # Per open group: [group_type, name, params, tables attributes, location]
+        self.templates: Dict[str, tuple] = {}  # name -> (variables, {n: row text}, location)
+        self.tables: List[_Table] = []
+
+    def start_group(self, group_type, name):
+        self.frames.append([group_type, name, {}, None, self.location()])
+
+    def attribute(self, name, value):
+        if name.startswith('variable_') or name in KEY_PARAMS:
+            self.frames[-1][2][name] = value
+
+    def complex_attribute(self, name, params):
+        if name in INDEX_NAMES or name == 'values':
+            frame = self.frames[-1]
+            if frame[3] is None:
+                frame[3] = {}
+            frame[3][name] = params
+
+    def end_group(self):
+        group_type, name, params, attributes, loc = self.frames.pop()
+        if attributes is None:
+            return
+        indexes = {n: ','.join(attributes[f'index_{n}']) for n in (1, 2, 3) if f'index_{n}' in attributes}
+        if group_type in TEMPLATE_TYPES:
+            variables = [params[f'variable_{n}'] for n in (1, 2, 3) if f'variable_{n}' in params]
+            self.templates[name] = (variables, indexes, loc)
+        elif 'values' in attributes:
+            path = '/'.join(self._segment(*frame[:3]) for frame in self.frames[1:])
+            path = f"{path}/{group_type} ({name})" if path else f"{group_type} ({name})"
+            self.tables.append(_Table(group_type, name, path, loc, indexes, attributes['values']))
+
+    @staticmethod
+    def _segment(group_type, name, params):
+        if name:
+            return f"{group_type} ({name})"
+        return f"{group_type} ({', '.join(f'{k}={params[k]}' for k in KEY_PARAMS if k in params)})"
+
+    def finish(self):
+        templates = {}
+        for name, (variables, texts, loc) in self.templates.items():
+            indexes = dict(zip(texts, _parse_batch(list(texts.values()))))
+            self._check_indexes(f"template {name}", indexes, loc)
+            templates[name] = (variables, indexes)
+
+        tables = self.tables
+        flat_values = _parse_batch([','.join(table.rows) for table in tables])
+        buckets = defaultdict(list)  # (shape, group_type kind, load axis) -> [table]
+        for table, flat in zip(tables, flat_values):
+            key = self._shape(table, flat, templates)
+            if key is not None:
+                buckets[key].append(table)
+
+        for (shape, kind, load_axis), batch in buckets.items():
+            self._check_batch(batch, shape, kind, load_axis)
+        logger.debug(f"Checked {len(tables)} tables in {len(buckets)} batches")
+        self.tables = []
+        self.templates = {}
+
+    def _check_indexes(self, owner, indexes, loc):
+        for n, index in indexes.items():
+            if index is None:
+                self.report(f"{owner}: index_{n} is not numeric", loc)
+            elif len(index) > 1 and not (np.diff(index) > 0).all():
+                self.report(f"{owner}: index_{n} is not strictly increasing", loc, code="E507")
+
+    def _shape(self, table: _Table, flat, templates) -> Optional[tuple]:
+        """
+        Check table values against its index, and set table.values
+        :return: Batch key, or None if the table can't be checked further
+        """
+        if flat is None:
+            self.report(f"{table.path}: values are not numeric", table.loc)
+            return None
+        own = dict(zip(table.indexes, _parse_batch(list(table.indexes.values()))))
+        self._check_indexes(table.path, own, table.loc)
+
+        variables, indexes = [], {}
+        if table.template in templates:
+            variables, indexes = templates[table.template]
+        elif table.template != 'scalar':
+            self.report(f"{table.path}: template {table.template} is not defined", table.loc,
+                        level="warning", code="W502")
+        indexes = {**indexes, **own}
+        if any(index is None for index in indexes.values()):
+            return None
+
+        ndim = len(variables) or len(indexes)
+        if ndim == 0:  # Scalar table
+            table.values = flat.reshape(-1)
+            return (table.values.shape, self._kind(table), None)
+        missing = [n for n in range(1, ndim + 1) if n not in indexes]
+        if missing:
+            self.report(f"{table.path}: no index_{missing[0]} in the table or its template", table.loc)
+            return None
+
+        shape = tuple(len(indexes[n]) for n in range(1, ndim + 1))
+        columns = {row.count(',') + 1 for row in table.rows}
+        expected_rows = int(np.prod(shape[:-1])) if ndim > 1 else 1
+        if len(columns) > 1 or len(table.rows) != expected_rows or min(columns) != shape[-1]:
+            self.report(f"{table.path}: values are {len(table.rows)} rows of {'/'.join(map(str, sorted(columns)))}, "
+                        f"index is {'x'.join(map(str, shape))}", table.loc)
+            return None
+        table.values = flat.reshape(shape)
+
+        load_axis = None
+        for i, variable in enumerate(variables):
+            if variable in LOAD_VARIABLES:
+                load_axis = i
+                break
+        if load_axis is None and not variables and ndim == 2:  # index_1 slew, index_2 load by default
+            load_axis = 1
+        return shape, self._kind(table), load_axis
+
+    @staticmethod
+    def _kind(table: _Table) -> str:
+        if table.group_type in DELAY_TYPES:
+            return 'delay'
+        return 'power' if table.group_type in POWER_TYPES else 'other'
+
+    def _check_batch(self, batch: List[_Table], shape, kind, load_axis):
+        values = np.stack([table.values for table in batch])  # (table, *shape)
+        n = len(batch)
+        flat = values.reshape(n, -1)
+
+        finite = np.isfinite(flat)
+        for i in np.flatnonzero(~finite.all(axis=1)).tolist():
+            self.report(f"{batch[i].path}: {int((~finite[i]).sum())} NaN or infinite values, first at "
+                        f"{_position(~np.isfinite(values[i]))}", batch[i].loc, code="E503")
+        if kind == 'other':
+            return
+
+        negative = flat < 0
+        for i in np.flatnonzero(negative.any(axis=1)).tolist():
+            level, code = ("error", "E504") if kind == 'delay' else ("warning", "W504")
+            self.report(f"{batch[i].path}: {int(negative[i].sum())} negative values, min {flat[i].min():.6g} at "
+                        f"{_position(values[i] == np.nanmin(values[i]))}", batch[i].loc, level=level, code=code)
+
+        with np.errstate(invalid='ignore'):
+            scale = np.nanmax(np.abs(np.where(finite, flat, np.nan)), axis=1, initial=0.0)
+        scale = scale.reshape((n,) + (1,) * len(shape))
+
+        if kind == 'delay' and load_axis is not None and shape[load_axis] > 1:
+            drops = np.diff(values, axis=load_axis + 1)
+            bad = drops < -self.monotonic_tolerance * scale
+            for i in np.flatnonzero(bad.reshape(n, -1).any(axis=1)).tolist():
+                self.report(f"{batch[i].path}: decreases with load at {_position(bad[i])}, "
+                            f"by {-drops[i][bad[i]].min():.6g}", batch[i].loc, level="warning", code="W505")
+
+        self._check_spikes(batch, values, shape, scale)
+
+    def _check_spikes(self, batch, values, shape, scale):
+        axes = [axis for axis, size in enumerate(shape) if size >= 3]
+        if not axes:
+            return
+        interior = [slice(None)] + [slice(1, -1) if size >= 3 else slice(None) for size in shape]
+        center = values[tuple(interior)]
+        spikes = np.ones(center.shape, dtype=bool)
+        for axis in axes:
+            left, right = list(interior), list(interior)
+            left[axis + 1], right[axis + 1] = slice(None, -2), slice(2, None)
+            a, b = values[tuple(left)], values[tuple(right)]
+            extremum = ((center > a) & (center > b)) | ((center < a) & (center < b))
+            far = np.abs(center - (a + b) / 2) > self.spike_ratio * np.maximum(
+                np.maximum(np.abs(a), np.abs(b)), 1e-3 * scale)
+            spikes &= extremum & far
+        for i in np.flatnonzero(spikes.reshape(len(batch), -1).any(axis=1)).tolist():
+            position = _position(spikes[i])
+            position = tuple(p + 1 if axis in axes else p for axis, p in enumerate(position))
+            self.report(f"{batch[i].path}: spike of {values[i][position]:.6g} at {position}", batch[i].loc,
+                        level="warning", code="W506")
+
+
+TABLE_RULES = [TableSanityRule]
@@ -0,0 +1,121 @@
+import random
+from typing import Iterator
+
+
+def _row(values) -> str:
+    return ', '.join(f"{v:.4f}" for v in values)
+
+
+def _table(lines, level, group_type, template, index_1, index_2, rng, scale):
+    pad = '  ' * level
+    lines.append(f"{pad}{group_type} ({template}) {{")
+    lines.append(f'{pad}  index_1 ("{_row(index_1)}");')
+    if index_2:
+        lines.append(f'{pad}  index_2 ("{_row(index_2)}");')
+        rows = [[scale * (0.02 + 0.3 * s + 0.1 * c) * rng.uniform(0.95, 1.05) for c in index_2] for s in index_1]
+    else:
+        rows = [[scale * (0.02 + 0.3 * s) * rng.uniform(0.95, 1.05) for s in index_1]]
+    lines.append(f"{pad}  values ( \\")
+    lines.append(', \\\n'.join(f'{pad}    "{_row(row)}"' for row in rows) + ");")
+    lines.append(f"{pad}}}")
+
+
+def iter_synthetic_library(cells=100, inputs=2, outputs=1, buses=1, bus_width=8, table_size=(7, 7),
+                           power=True, seed=0, name='synthetic') -> Iterator[str]:
+    """
+    Generate text of a synthetic NLDM library, cell by cell, for benchmarks and tests.
+    Each cell has `inputs` input pins, `buses` input buses of `bus_width` bits, such as ADR[0:7],
+    and `outputs` output pins with a timing arc, plus internal power if `power`, from every input pin.
+    Arcs hold cell_rise, cell_fall, rise_transition and fall_transition tables of table_size,
+    (n,) for 1-D or (n, m) for 2-D tables. The same arguments always give the same text.
+    """
+    rng = random.Random(seed)
+    index_1 = [0.005 * 2 ** i for i in range(table_size[0])]
+    index_2 = [0.001 * 2 ** i for i in range(table_size[1])] if len(table_size) > 1 else []
+    template = f"delay_template_{'x'.join(map(str, table_size))}"
+    power_template = f"power_template_{'x'.join(map(str, table_size))}"
+
+    lines = [
+        f"library ({name}) {{",
+        "  delay_model : table_lookup;",
+        '  time_unit : "1ns";',
+        '  voltage_unit : "1V";',
+        '  current_unit : "1mA";',
+        '  leakage_power_unit : "1nW";',
+        "  capacitive_load_unit (1, pf);",
+        "  nom_voltage : 0.75;",
+        "  nom_temperature : 25;",
+        "  voltage_map (VDD, 0.75);",
+        "  voltage_map (VSS, 0);",
+    ]
+    for template_type, template_name in (('lu_table_template', template), ('power_lut_template', power_template)):
+        lines.append(f"  {template_type} ({template_name}) {{")
+        lines.append("    variable_1 : input_net_transition;")
+        if index_2:
+            lines.append("    variable_2 : total_output_net_capacitance;")
+        lines.append(f'    index_1 ("{_row(index_1)}");')
+        if index_2:
+            lines.append(f'    index_2 ("{_row(index_2)}");')
+        lines.append("  }")
+    if buses:
+        lines += [f"  type (bus_{bus_width}) {{", "    base_type : array;", "    data_type : bit;",
+                  f"    bit_width : {bus_width};", f"    bit_from : {bus_width - 1};", "    bit_to : 0;",
+                  "    downto : true;", "  }"]
+    yield '\n'.join(lines) + '\n'
+
+    input_names = [chr(ord('A') + i) if i < 26 else f"I{i}" for i in range(inputs)]
+    for c in range(cells):
+        lines = [f"  cell (CELL_{c}) {{",
+                 f"    area : {rng.uniform(0.5, 8.0):.4f};",
+                 f"    cell_leakage_power : {rng.uniform(0.1, 20.0):.4f};"]
+        related = list(input_names)
+        for pin in input_names:
+            lines += [f"    pin ({pin}) {{", "      direction : input;",
+                      f"      capacitance : {rng.uniform(0.0005, 0.003):.6f};",
+                      '      related_power_pin : "VDD";', '      related_ground_pin : "VSS";', "    }"]
+        for b in range(buses):
+            bus = f"ADR{b}" if buses > 1 else "ADR"
+            lines += [f"    bus ({bus}) {{", f"      bus_type : bus_{bus_width};", "      direction : input;"]
+            for bit in range(bus_width):
+                lines += [f"      pin ({bus}[{bit}]) {{", f"        capacitance : {rng.uniform(0.0005, 0.003):.6f};",
+                          "      }"]
+            lines.append("    }")
+            related.append(f"{bus}[0]")
+
+        for o in range(outputs):
+            function = ' & '.join(input_names) or '1'
+            lines += [f"    pin (Z{o if outputs > 1 else ''}) {{", "      direction : output;",
+                      f'      function : "{function}";', "      max_capacitance : 0.2;"]
+            for pin in related:
+                lines += ["      timing () {", f'        related_pin : "{pin}";',
+                          "        timing_sense : positive_unate;", "        timing_type : combinational;"]
+                for table in ('cell_rise', 'cell_fall', 'rise_transition', 'fall_transition'):
+                    _table(lines, 4, table, template, index_1, index_2, rng, 1.0)
+                lines.append("      }")
+                if power:
+                    lines += ["      internal_power () {", f'        related_pin : "{pin}";']
+                    for table in ('rise_power', 'fall_power'):
+                        _table(lines, 4, table, power_template, index_1, index_2, rng, 0.01)
+                    lines.append("      }")
+            lines.append("    }")
+        lines.append("  }")
+        yield '\n'.join(lines) + '\n'
+    yield "}\n"
+
+
+def synthetic_library(**kwargs) -> str:
+    """Text of a synthetic library, see `iter_synthetic_library()`"""
+    return ''.join(iter_synthetic_library(**kwargs))
+
+
+def write_synthetic_library(file_path, **kwargs) -> int:
+    """
+    Write a synthetic library to file_path, see `iter_synthetic_library()`
+    :return: Number of characters written
+    """
+    written = 0
+    with open(file_path, 'w') as f:
+        for chunk in iter_synthetic_library(**kwargs):
+            f.write(chunk)
+            written += len(chunk)
+    return written
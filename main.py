@@ -1,7 +1,7 @@
 #!usr/bin/python3
-import json
 from liberty_sdk.tools.logger import setup_logger
-from liberty_sdk.parser.liberty_parser import LibertyParser, LibertyJSONEncoder
+from liberty_sdk.parser.liberty_parser import LibertyParser
+from liberty_sdk.parser.liberty_json import dump_json
 
 # For building custom LIB
 from liberty_sdk.builder.liberty_builder import LibBuilder, atomic
@@ -19,12 +19,12 @@ logger.info(f"Parse success. <{type(library)}>")
 """Lib2Json"""
 output_json = 'test/test_cell.json'
 with open(output_json, 'w') as f:
-    json.dump(library, f, cls=LibertyJSONEncoder, indent=2)
+    dump_json(library, f, indent=2)
 
 """LibClass2File"""
 output_lib = 'test/output_cell.lib'
 with open(output_lib, 'w') as f:
-    f.write(library.dump(indent_value=True, indent_separator='  '))
+    library.dump_to(f, indent_value=True, indent_separator='  ')
 
 """Build custom LIB"""
 
@@ -7,6 +7,9 @@ setup(
     install_requires=[
         'colorlog',
     ],
+    extras_require={
+        'numpy': ['numpy'],  # Numeric lookup tables
+    },
     # entry_points={
     #     'console_scripts': [
     #         'liberty_sdk=main:main',  # TODO: For command-line tool entry: klib dump -i cell.lib -o cell.json
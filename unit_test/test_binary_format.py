@@ -0,0 +1,52 @@
+import os
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser, ParseError
+
+try:
+    import numpy as np
+    from liberty_sdk.parser.binary_format import BinaryLibrary, write_binary, read_binary
+except ImportError:
+    np = None
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+TEST_DIR = 'tmp'
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class BinaryFormatTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.library = LibertyParser(TEST_LIB).parse()
+        self.path = f"{TEST_DIR}/test_cell.ltree"
+        write_binary(self.library, self.path)
+
+    def test_round_trip(self):
+        assert read_binary(self.path) == self.library
+
+    def test_cell_access(self):
+        with BinaryLibrary(self.path) as library:
+            cell = library.cell('NAND2')
+            assert cell.to_group() == self.library.get(cell='NAND2')
+            assert library.get(cell='AND2', pin='o').get('function') == '"(A & B)"'
+            table = cell.get(pin='o', timing="", cell_fall="delay_temp_3x3").table()
+            np.testing.assert_array_equal(table[0], [0.1, 0.2, 0.3])
+            with self.assertRaises(KeyError):
+                library.cell('NOPE')
+
+            tree = library.tree
+            arcs = tree.where('timing', related_pin='B')
+            assert tree.labels(tree.ancestor(arcs, 'cell')) == ['AND2', 'NAND2']
+
+    def test_invalid_file(self):
+        bad_path = f"{TEST_DIR}/bad.ltree"
+        with open(bad_path, 'wb') as f:
+            f.write(b'library (x) { }' * 8)
+        with self.assertRaises(ParseError):
+            BinaryLibrary(bad_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
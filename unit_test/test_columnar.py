@@ -0,0 +1,66 @@
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser, LibertyGroup
+
+try:
+    import numpy as np
+    from liberty_sdk.parser.columnar import ColumnarBuilder, parse_columnar
+except ImportError:
+    np = None
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class ColumnarTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tree = parse_columnar(TEST_LIB)
+        self.library = LibertyParser(TEST_LIB).parse()
+
+    def test_same_as_tree(self):
+        assert self.tree.to_group() == self.library
+        assert self.tree.view(0).to_group().dump() == self.library.dump()
+
+    def test_view(self):
+        root = self.tree.root
+        assert root.group_type == 'library'
+        assert root.get(cell='AND2', pin='o').get('function') == '"(A & B)"'
+        assert root.get(cell='AND2', pin='o', timing="", cell_rise="delay_temp_3x3").get('index_2') == \
+            '10.0, 20.0, 30.0'
+        table = root.get(cell='AND2', pin='o', timing="", cell_rise="delay_temp_3x3").table()
+        np.testing.assert_array_equal(table[2], [0.12, 0.22, 0.32])
+        assert root.get(cell='NOPE') is root
+
+    def test_scan(self):
+        tree = self.tree
+        arcs = tree.where('timing', timing_sense='negative_unate')
+        assert tree.labels(tree.ancestor(arcs, 'cell')) == ['NAND2', 'NAND2']
+        assert tree.param_values(arcs, 'related_pin') == ['"A"', '"B"']
+        assert len(tree.where('timing', related_pin='A')) == 2
+
+        # Same as walking the tree
+        cells = tree.groups('cell')
+        areas = tree.numeric_values(cells, 'area')
+        for name, area in zip(tree.labels(cells), areas.tolist()):
+            expected = self.library.get(cell=name).params.get('area')
+            if expected is None:
+                assert np.isnan(area)
+            else:
+                assert area == float(expected)
+
+    def test_text_rows_kept(self):
+        builder = LibertyParser.from_string(
+            'library (x) { t () { index_1 ("0.50, 1.0"); values ("a, b", "c"); } }'
+        ).parse_events(ColumnarBuilder())
+        tree = builder.build()
+        table = tree.to_group().get(t="")
+        assert isinstance(table, LibertyGroup)
+        assert table.get('index_1') == '0.50, 1.0'
+        assert table.get('values') == ['a, b', 'c']
+        np.testing.assert_array_equal(tree.view(1).table('index_1'), [[0.5, 1.0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
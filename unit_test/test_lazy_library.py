@@ -0,0 +1,82 @@
+import os
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser, LibertyGroup
+from liberty_sdk.parser.lazy_library import LazyLibrary
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+TEST_DIR = 'tmp'
+
+COMMENTED_LIB = """library (x) {
+    time_unit : "1ns";
+    cell (A) {
+        area : 1;
+    }
+    /* cell (OLD) {
+        area : 9;
+    } */
+    // cell (OLDER) {
+    cell (B) /* note */ {
+        area : 2;
+        pin (Z) { function : "{A}"; }
+    }
+    cell ("C")
+    {
+        area : 3;
+    }
+    test_cell (T) { cell (NOT_A_CELL) { } }
+    comment : "cell (IN_STRING) {";
+    cell (DEEP) {
+        a () { b () { c () { d () { e () { f () { g () { h () { i () { j () { k () { l () { m () { n () { o () { p () { q () { r () { }}}}}}}}}}}}}}}}}}
+    }
+}
+"""
+
+
+class LazyLibraryTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.library = LibertyParser(TEST_LIB).parse()
+        self.lazy = LazyLibrary(TEST_LIB)
+
+    def tearDown(self) -> None:
+        self.lazy.close()
+
+    def test_index(self):
+        assert self.lazy.cell_names() == ['DFF', 'AND2', 'NAND2']
+        index = self.lazy.index['AND2']
+        assert index.line == 68
+        with open(TEST_LIB, 'rb') as f:
+            f.seek(index.offset)
+            block = f.read(index.length)
+        assert block.lstrip().startswith(b'cell (AND2)') and block.endswith(b'}')
+
+    def test_load_on_demand(self):
+        pin = self.lazy.get(cell='AND2', pin='o')
+        assert isinstance(pin, LibertyGroup)
+        assert pin.params == self.library.get(cell='AND2', pin='o').params
+        loaded = {cell.name: cell.loaded for cell in self.lazy.root.children if hasattr(cell, 'loaded')}
+        assert loaded == {'DFF': False, 'AND2': True, 'NAND2': False}
+
+        # Cached after first access
+        assert self.lazy.cell('AND2').children is self.lazy.cell('AND2').children
+
+    def test_same_as_full_parse(self):
+        assert self.lazy.get('voltage_map') == self.library.get('voltage_map')
+        assert self.lazy.root.dump() == self.library.dump()
+
+    def test_comments(self):
+        os.makedirs(TEST_DIR, exist_ok=True)
+        file_path = os.path.join(TEST_DIR, 'lazy_commented.lib')
+        with open(file_path, 'w') as f:
+            f.write(COMMENTED_LIB)
+        with LazyLibrary(file_path) as lazy:
+            assert lazy.cell_names() == ['A', 'B', 'C', 'DEEP']
+            assert [cell.line for cell in lazy.cells] == [3, 10, 14, 20]
+            assert lazy.get(cell='B').params['area'] == '2'
+            assert lazy.root.dump() == LibertyParser(file_path).parse().dump()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser, LibertyGroup, ComplexLibertyAttribute
+
+try:
+    import numpy as np
+    from liberty_sdk.parser.liberty_diff import diff_libraries, tree_digests
+except ImportError:
+    np = None
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class LibertyDiffTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.old = LibertyParser(TEST_LIB).parse()
+        self.new = LibertyParser(TEST_LIB).parse()
+
+    def test_identical(self):
+        diff = diff_libraries(self.old, self.new)
+        assert not diff
+        assert diff.compared == 0 and diff.skipped == 1
+        assert tree_digests(self.old)[id(self.old)] == tree_digests(self.new)[id(self.new)]
+
+    def test_changes(self):
+        new = self.new
+        new.get(cell='NAND2').params['area'] = '2'
+        and2 = new.get(cell='AND2')
+        and2.children = [child for child in and2.children if not child.match('pin', 'b')]
+        new.children.append(LibertyGroup('cell', 'INV', {'area': '0.5'}))
+
+        # Within tolerance, then out of it
+        rise = new.get(cell='AND2', pin='o', timing="", cell_rise='delay_temp_3x3')
+        rise.find_child('values').params[0] = '0.1000001, 0.2, 0.3'
+        fall = new.get(cell='NAND2', pin='o', timing="", cell_fall='delay_temp_3x3')
+        fall.find_child('values').params[2] = '0.12, 0.25, 0.32'
+
+        diff = diff_libraries(self.old, new, rtol=1e-3)
+        summary = diff.summary()
+        assert summary['cell'] == {'added': 1, 'removed': 0, 'changed': 2}
+        assert summary['pin'] == {'added': 0, 'removed': 1, 'changed': 1}
+        assert summary['attribute'] == {'added': 0, 'removed': 0, 'changed': 1}
+        assert summary['table'] == {'added': 0, 'removed': 0, 'changed': 1}
+        assert summary['arc']['changed'] == 1
+
+        table = [d for d in diff.differences if d.target == 'table'][0]
+        assert table.path[1:] == ('cell (NAND2)', 'pin (o)', 'timing (related_pin="A")', 'cell_fall (delay_temp_3x3)')
+        assert 'at (2, 1)' in table.detail
+        assert diff.skipped > 0
+        assert 'INV' in diff.report()
+
+    def test_timing_sense(self):
+        timing = self.new.get(cell='NAND2', pin='o', timing="")
+        timing.params['timing_sense'] = 'positive_unate'
+        diff = diff_libraries(self.old, self.new)
+        assert len(diff) == 1
+        change = diff.differences[0]
+        assert (change.kind, change.target, change.name) == ('changed', 'attribute', 'timing_sense')
+        assert change.path[-1] == 'timing (related_pin="A")'
+        assert (change.old, change.new) == ('negative_unate', 'positive_unate')
+
+    def test_repeated_attributes(self):
+        self.new.children[self.new.children.index(self.new.find_child('voltage_map'))] = \
+            ComplexLibertyAttribute('voltage_map', ['VDD', '0.8'])
+        diff = diff_libraries(self.old, self.new)
+        assert len(diff) == 1
+        assert diff.differences[0].new == ['VDD', '0.8']
+
+
+if __name__ == '__main__':
+    unittest.main()
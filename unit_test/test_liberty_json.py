@@ -0,0 +1,65 @@
+import io
+import json
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser, LibertyJSONEncoder, LibertyGroup, LibertyAttribute, \
+    ComplexLibertyAttribute
+from liberty_sdk.parser.liberty_json import iter_json, dump_json, dump_ndjson, load_json, load_ndjson
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+TEST_JSON = 'test/test_cell.json'
+
+
+class LibertyJSONTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.library = LibertyParser(TEST_LIB).parse()
+
+    def test_same_as_encoder(self):
+        f = io.StringIO()
+        written = dump_json(self.library, f, buffer_size=64)
+        assert written == len(f.getvalue())
+        with open(TEST_JSON) as ref:
+            assert f.getvalue() == ref.read()
+
+        for indent in (None, 0, 4, '\t'):
+            assert ''.join(iter_json(self.library, indent=indent)) == \
+                json.dumps(self.library, cls=LibertyJSONEncoder, indent=indent)
+
+    def test_ndjson(self):
+        f = io.StringIO()
+        dump_ndjson(self.library, f)
+        lines = f.getvalue().splitlines()
+        header, cells = json.loads(lines[0]), [json.loads(line) for line in lines[1:]]
+
+        assert header['type'] == 'library'
+        assert all(group['type'] != 'cell' for group in header['group'])
+        assert [cell['name'] for cell in cells] == [cell.name for cell in self.library.children
+                                                   if getattr(cell, 'group_type', None) == 'cell']
+        assert cells[1] == self.library.get(cell='AND2').asdict()
+
+    def test_round_trip(self):
+        with open(TEST_JSON) as f:
+            library = load_json(f)
+        assert isinstance(library, LibertyGroup)
+        assert library.asdict() == self.library.asdict()
+        assert ''.join(iter_json(library)) == ''.join(iter_json(self.library))
+
+        # Cells have no repeated attributes, so they come back as parsed
+        for name in ('AND2', 'NAND2'):
+            assert library.get(cell=name) == self.library.get(cell=name)
+        table = library.get(cell='AND2', pin='o', timing="", cell_rise="delay_temp_3x3")
+        assert isinstance(table.find_child('index_1'), LibertyAttribute)
+        assert isinstance(table.find_child('values'), ComplexLibertyAttribute)
+        assert library.get('capacitive_load_unit') == ['1', 'pf']
+        assert library.params['time_unit'] == '"1ns"'
+
+        f = io.StringIO()
+        dump_ndjson(self.library, f)
+        f.seek(0)
+        assert load_ndjson(f).asdict() == self.library.asdict()
+
+
+if __name__ == '__main__':
+    unittest.main()
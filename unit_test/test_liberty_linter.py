@@ -0,0 +1,131 @@
+import os
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.tools.synthetic import synthetic_library
+from liberty_sdk.parser.liberty_linter import (LibertyLinter, LintRule, BracketRule, IndentationRule, UnitRule,
+                                               DuplicateGroupRule, lint_sharded)
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+TEST_DIR = 'tmp'
+
+LIB_TEXT = """library (lint) {
+    time_unit : "1ns";
+    voltage_unit : "2V";
+    current_unit : "1mA";
+    time_unit : "1ps";
+    cell (INV) {
+        pin (A) {
+            direction : input;
+        }
+        pin (A) {
+          direction : input;
+          }
+    }
+}
+"""
+
+
+class CellCountRule(LintRule):
+    code = "W900"
+
+    def __init__(self, linter):
+        super().__init__(linter)
+        self.cells = 0
+
+    def start_group(self, group_type, name):
+        if group_type == 'cell':
+            self.cells += 1
+
+    def finish(self):
+        self.report(f"{self.cells} cells", self.linter.location())
+
+
+class LibertyLinterTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.file_path = os.path.join(TEST_DIR, 'lint.lib')
+        with open(self.file_path, 'w') as f:
+            f.write(LIB_TEXT)
+
+    def codes(self, linter):
+        return [(d['code'], d['location']['start_line'], d['location']['column']) for d in linter.diagnostics]
+
+    def test_rules(self):
+        linter = LibertyLinter(self.file_path)
+        assert not linter.run_checks()
+        codes = self.codes(linter)
+        assert ('E302', 3, 5) in codes  # voltage_unit "2V"
+        assert ('W303', 5, 5) in codes  # time_unit redefined
+        assert ('W301', 1, 1) in codes  # no capacitive_load_unit
+        assert ('E401', 10, 9) in codes  # pin (A) twice
+        assert ('W202', 11, 11) in codes
+        assert ('W102', 12, 11) in codes  # '}' of pin (A) at line 10
+        assert len(linter.errors) == 2
+        entry = linter.errors[0]
+        assert entry == {"level": "error", "code": "E302", "message": entry["message"],
+                         "location": {"start_line": 3, "end_line": 3, "column": 5}}
+        assert linter.generate_report().endswith("2 errors, 5 warnings")
+
+    def test_rule_selection(self):
+        linter = LibertyLinter(self.file_path, rules=[DuplicateGroupRule, CellCountRule])
+        linter.run_checks()
+        assert [code for code, _, _ in self.codes(linter)] == ['E401', 'W900']
+        assert linter.warnings[0]['message'] == '1 cells'
+
+    def test_syntax_error(self):
+        with open(self.file_path, 'w') as f:
+            f.write(LIB_TEXT.replace('direction : input;\n        }', 'direction : input\n        }', 1))
+        linter = LibertyLinter(self.file_path)
+        assert not linter.run_checks()
+        assert linter.errors[-1]['code'] == 'E001'
+
+    def test_truncated(self):
+        for text, line in (('library (x) {\n    cell (A', 2), ('library (x) {\n    pin (A[', 2)):
+            with open(self.file_path, 'w') as f:
+                f.write(text)
+            linter = LibertyLinter(self.file_path)
+            assert not linter.run_checks()
+            assert [(d['code'], d['location']['start_line']) for d in linter.errors] == [('E001', line)]
+            assert 'Unexpected EOF' in linter.errors[0]['message']
+
+    def test_clean_library(self):
+        linter = LibertyLinter(TEST_LIB, rules=[UnitRule, DuplicateGroupRule])
+        assert linter.run_checks()
+        assert not linter.warnings
+
+    def test_tab_indent(self):
+        with open(self.file_path, 'w') as f:
+            f.write("library (x) {\n\tcell (A) {\n\t    area : 1;\n\t\tpin (Z) {\n  \t  }\n\t}\n}\n")
+        linter = LibertyLinter(self.file_path, rules=[BracketRule, IndentationRule])
+        linter.run_checks()  # Width 8 from the first line, '  \t  }' is indented 10
+        assert self.codes(linter) == [('W202', 3, 13), ('W102', 5, 11), ('W202', 5, 11)]
+        linter = LibertyLinter(TEST_LIB, rules=[BracketRule, IndentationRule])
+        linter.run_checks()
+        assert not [d for d in linter.warnings if d['location']['start_line'] in (42, 46)]  # ff (FF) by a tab
+
+    def test_inferred_width(self):
+        with open(self.file_path, 'w') as f:
+            f.write(synthetic_library(cells=2, table_size=(3, 3)))
+        linter = LibertyLinter(self.file_path)
+        assert linter.run_checks()
+        assert not linter.warnings
+
+        class Width4Rule(IndentationRule):
+            indent_width = 4
+
+        linter = LibertyLinter(self.file_path, rules=[Width4Rule])
+        linter.run_checks()
+        assert ('W202', 2, 3) in self.codes(linter)
+
+    def test_sharded(self):
+        single = LibertyLinter(self.file_path, rules=[BracketRule, IndentationRule, UnitRule, DuplicateGroupRule])
+        single.run_checks()
+        merged = lint_sharded(self.file_path, shards=2)
+        assert merged.errors == single.errors
+        assert merged.warnings == single.warnings
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser, LibertyGroup
+from liberty_sdk.parser.liberty_query import compile_query, select, QueryError
+from liberty_sdk.tools.synthetic import synthetic_library
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+
+
+class LibertyQueryTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.library = LibertyParser(TEST_LIB).parse()
+
+    def names(self, query):
+        return [(group.group_type, group.name) for group in self.library.select(query)]
+
+    def test_path(self):
+        tables = list(self.library.select('cell[NAND*]/pin[direction=output]/timing[related_pin="A"]/cell_rise'))
+        assert tables == [self.library.get(cell='NAND2', pin='o', timing="", cell_rise="delay_temp_3x3")]
+        assert self.names('cell') == [('cell', 'DFF'), ('cell', 'AND2'), ('cell', 'NAND2')]
+        assert len(self.names('cell/pin/timing')) == 4
+        assert self.names('cell[AND2]/pin[a, direction=input]') == [('pin', 'a')]
+        assert self.names('cell[AND2]/pin[a][direction=output]') == []
+
+    def test_predicates(self):
+        assert self.names('cell/pin["ADR[*]"]') == [('pin', 'ADR[8]')]
+        assert self.names('cell/pin[ADR[8]]') == [('pin', 'ADR[8]')]
+        assert self.names('cell[area>=1]') == [('cell', 'AND2'), ('cell', 'NAND2')]
+        assert self.names('cell[area<1]') == []
+        assert self.names('cell[area!=*]') == [('cell', 'DFF')]
+        assert self.names('cell[DFF]/*[C??]') == [('pin', 'CLK'), ('pin', 'CLR')]
+        assert len(self.names('cell/pin/timing[""][related_pin!=A]')) == 2
+        assert self.names('cell[NAND2]/pin[o]/timing[related_pin=B]/*_rise') == [('cell_rise', 'delay_temp_3x3')]
+
+    def test_descendant(self):
+        assert len(self.names('//timing[timing_sense=negative_unate]')) == 2
+        assert len(self.names('//cell_rise')) == 4
+        assert len(self.names('cell[AND2]//cell_rise')) == 2
+        assert len(self.names('//pin//cell_rise')) == 4  # Each once
+
+    def test_compile(self):
+        query = compile_query('cell[AND*]/pin')
+        assert compile_query('cell[AND*]/pin') is query
+        assert query.first(self.library).name == 'a'
+        assert list(select(self.library, query)) == list(self.library.select('cell[AND*]/pin'))
+        for text in ('', 'cell[', 'cell]', 'cell[area>big]', 'cell[]', 'cell/'):
+            with self.assertRaises(QueryError):
+                compile_query(text)
+
+    def test_streaming(self):
+        library = LibertyParser.from_string(synthetic_library(cells=500, table_size=(2, 2))).parse()
+        arcs = library.select('cell[CELL_1*]/pin[direction=output]/timing[related_pin="A"]')
+        assert next(arcs).get('related_pin') == '"A"'
+        expected = [timing for cell in library.children if isinstance(cell, LibertyGroup)
+                    and cell.group_type == 'cell' and cell.name.startswith('CELL_1')
+                    for pin in cell.children if pin.match('pin') and pin.params.get('direction') == 'output'
+                    for timing in pin.children if timing.match('timing') and timing.params['related_pin'] == '"A"']
+        assert len(expected) == 111
+        assert list(library.select('cell[CELL_1*]/pin[direction=output]/timing[related_pin="A"]')) == expected
+
+
+if __name__ == '__main__':
+    unittest.main()
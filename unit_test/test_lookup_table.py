@@ -0,0 +1,90 @@
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser
+
+try:
+    import numpy as np
+    from liberty_sdk.parser.lookup_table import LookupTable, lookup
+except ImportError:
+    np = None
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class LookupTableTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.library = LibertyParser(TEST_LIB, numeric_tables=True).parse()
+
+    def test_numeric_tables(self):
+        table = self.library.get(cell='AND2', pin='o', timing="", cell_rise="delay_temp_3x3")
+        assert isinstance(table, LookupTable)
+        assert table.index_1.dtype == np.float64
+        np.testing.assert_array_equal(table.index_2, [10.0, 20.0, 30.0])
+        assert table.values.shape == (3, 3)
+        assert table.values[2, 1] == 0.22
+
+        # String API is unchanged
+        assert table.get('values') == ['0.1, 0.2, 0.3', '0.11, 0.21, 0.31', '0.12, 0.22, 0.32']
+        assert table.get('index_1') == '0.5, 1.0, 1.5'
+
+        # Templates have no values, they are not tables
+        assert not isinstance(self.library.get(lu_table_template='delay_temp_3x3'), LookupTable)
+
+        recursive = LibertyParser(TEST_LIB, iterative=False, numeric_tables=True).parse()
+        assert recursive.dump() == self.library.dump()
+
+    def test_single_row(self):
+        text = ('library (x) {\n  t (s) {\n    index_1 ("0.5");\n    index_2 ("10, 20");\n'
+                '    values ("0.1, 0.2");\n  }\n}\n')
+        plain = LibertyParser.from_string(text).parse()
+        library = LibertyParser.from_string(text, numeric_tables=True).parse()
+        table = library.get(t='s')
+        assert table.values.shape == (1, 2)
+        assert table.get('values') == plain.get(t='s').get('values') == '0.1, 0.2'
+        self.assertAlmostEqual(lookup(table, 0.5, 15.0), 0.15)
+        table.find_child('values').value = '0.3, 0.4'
+        assert table.values.shape == (1, 2)
+        assert table.get('values') == '0.3, 0.4'
+
+    def test_dump_round_trip(self):
+        table = self.library.get(cell='NAND2', pin='o', timing="", cell_rise="delay_temp_3x3")
+        table.values = table.values * 3 + 1e-17
+
+        text = self.library.dump()
+        reparsed = LibertyParser.from_string(text, numeric_tables=True).parse()
+        assert reparsed.dump() == text
+        np.testing.assert_array_equal(
+            reparsed.get(cell='NAND2', pin='o', timing="", cell_rise="delay_temp_3x3").values, table.values)
+
+        # Plain tree reads back the same
+        plain = LibertyParser(TEST_LIB).parse()
+        assert LibertyParser.from_string(plain.dump()).parse() == plain
+
+    def test_lookup(self):
+        table = self.library.get(cell='AND2', pin='o', timing="", cell_rise="delay_temp_3x3")
+        # Grid points
+        assert lookup(table, 1.0, 20.0) == 0.21
+        # Bilinear, in the middle of 4 points
+        self.assertAlmostEqual(table.lookup(0.75, 15.0), (0.1 + 0.2 + 0.11 + 0.21) / 4)
+        # Linear extrapolation
+        self.assertAlmostEqual(lookup(table, 2.0, 10.0), 0.13)
+
+        # Vectorized
+        slew = np.array([0.5, 1.0, 1.5])
+        np.testing.assert_allclose(lookup(table, slew[:, None], np.array([10.0, 20.0, 30.0])), table.values)
+
+        # Template of swapped variables: index_1 is load
+        template = self.library.get(lu_table_template='delay_temp_3x3')
+        template.set_params(variable_1='total_output_net_capacitance', variable_2='input_net_transition')
+        assert lookup(table, 20.0, 1.0, template=self.library) == 0.21
+
+        # String tables work as well
+        plain = LibertyParser(TEST_LIB).parse().get(cell='AND2', pin='o', timing="", cell_rise="delay_temp_3x3")
+        assert lookup(plain, 1.5, 30.0) == 0.32
+
+
+if __name__ == '__main__':
+    unittest.main()
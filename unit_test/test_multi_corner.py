@@ -0,0 +1,61 @@
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.tools.synthetic import synthetic_library
+from liberty_sdk.parser.liberty_parser import LibertyParser
+
+try:
+    import numpy as np
+    from liberty_sdk.parser.multi_corner import MultiCorner
+except ImportError:
+    np = None
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class MultiCornerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.libraries = {
+            corner: LibertyParser.from_string(synthetic_library(cells=5, table_size=(3, 4), seed=seed)).parse()
+            for seed, corner in enumerate(('ss', 'tt', 'ff'))
+        }
+        self.corners = MultiCorner(self.libraries)
+
+    def test_table(self):
+        table = self.corners.table('cell (CELL_2)/pin (Z)/timing (related_pin="B"*)/cell_fall (*)')
+        assert table.values.shape == (3, 3, 4)
+        assert table.same_index
+        for i, library in enumerate(self.libraries.values()):
+            rows = library.get(cell='CELL_2', pin='Z').children
+            arc = [g for g in rows if getattr(g, 'group_type', '') == 'timing' and g.params['related_pin'] == '"B"'][0]
+            expected = [list(map(float, row.split(','))) for row in arc.get(cell_fall='delay_template_3x4').get('values')]
+            np.testing.assert_array_equal(table.values[i], expected)
+        np.testing.assert_array_equal(table.max(), table.values.max(axis=0))
+        assert (table.sensitivity(reference=1)[1] == 0).all()
+
+    def test_stack_all(self):
+        paths, delays = self.corners.stack_all('cell_rise')
+        # 5 cells, arcs from A, B and ADR[0]
+        assert delays.shape == (15, 3, 3, 4)
+        assert len(paths) == 15 and all(path[-1].startswith('cell_rise') for path in paths)
+        worst = np.nanmax(delays, axis=1)
+        assert worst.shape == (15, 3, 4)
+
+    def test_missing(self):
+        del self.libraries['ff'].children[-1]  # Last cell
+        corners = MultiCorner(self.libraries)
+        missing = corners.missing()
+        assert missing and all(value == ['ff'] for value in missing.values())
+        table = corners.table(next(iter(missing)))
+        assert np.isnan(table.values[2]).all()
+        assert corners.stack_all('cell_rise')[1].shape[0] == 12
+
+        # Libraries named by their own name
+        library = LibertyParser(TEST_LIB).parse()
+        assert MultiCorner([library]).corners == ['cells']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser, ParseError
+from liberty_sdk.parser.parallel import parse_parallel, parse_many
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+TEST_DIR = 'tmp'
+
+COMMENTED_LIB = """library (x) {
+    cell (A) {
+        area : 1;
+    }
+    /* cell (OLD) {
+        area : 9;
+    } */
+    cell (B) /* note */ {
+        area : 2;
+    }
+    cell (A) {
+        area : 3;
+    }
+}
+"""
+
+
+class ParallelTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.library = LibertyParser(TEST_LIB).parse()
+
+    def test_parse_parallel(self):
+        assert parse_parallel(TEST_LIB, workers=2) == self.library
+        assert parse_parallel(TEST_LIB, workers=1) == self.library
+
+    def test_parse_parallel_comments(self):
+        os.makedirs(TEST_DIR, exist_ok=True)
+        file_path = os.path.join(TEST_DIR, 'parallel_commented.lib')
+        with open(file_path, 'w') as f:
+            f.write(COMMENTED_LIB)
+        library = LibertyParser(file_path).parse()
+        assert parse_parallel(file_path, workers=2) == library
+        assert [cell.params['area'] for cell in parse_parallel(file_path, workers=1).children] == ['1', '2', '3']
+
+    def test_parse_many(self):
+        if not os.path.exists(TEST_DIR):
+            os.makedirs(TEST_DIR)
+
+        bad_lib = f"{TEST_DIR}/bad_lib.lib"
+        with open(bad_lib, 'w') as f:
+            f.write("library(bad) {\n  area : 1;\n  cell (X) {\n    area 1;\n  }\n}\n")
+
+        finished = []
+        results = parse_many([TEST_LIB, bad_lib], workers=2, progress=finished.append)
+        assert list(results) == [TEST_LIB, bad_lib]
+        assert results[TEST_LIB] == self.library
+        assert isinstance(results[bad_lib], ParseError) and results[bad_lib].line == 4
+        assert sorted(r.path for r in finished) == sorted([TEST_LIB, bad_lib])
+        assert all(r.elapsed > 0 and r.size > 0 for r in finished)
+
+    def test_parse_many_unpicklable(self):
+        results = parse_many([TEST_LIB, TEST_LIB + '.missing'], workers=2, group_filter=lambda *args: True)
+        assert all(isinstance(error, Exception) for error in results.values())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import unittest
+from unittest import mock
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_parser import LibertyParser
+from liberty_sdk.parser.parse_cache import ParseCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+TEST_DIR = 'tmp/parse_cache'
+
+
+class ParseCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+        os.makedirs(TEST_DIR)
+        self.lib_path = f"{TEST_DIR}/cell.lib"
+        shutil.copy(TEST_LIB, self.lib_path)
+        self.cache = ParseCache(f"{TEST_DIR}/cache")
+        self.library = LibertyParser(TEST_LIB).parse()
+
+    def test_load_and_validate(self):
+        assert self.cache.load(self.lib_path) is None
+        assert LibertyParser(self.lib_path, cache_dir=self.cache).parse() == self.library
+        assert self.cache.load(self.lib_path) == self.library
+
+        # Touched, same content: still valid
+        os.utime(self.lib_path, ns=(0, 0))
+        assert self.cache.load(self.lib_path) == self.library
+
+        # Changed content of same size: invalid
+        with open(self.lib_path, 'r+') as f:
+            f.seek(len('library('))
+            f.write('CELLS')
+        assert self.cache.load(self.lib_path) is None
+        assert LibertyParser(self.lib_path, cache_dir=self.cache).parse().name == 'CELLS'
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numeric_tables(self):
+        with open(self.lib_path, 'w') as f:
+            f.write('library (x) {\n  cell (A) {\n    t (s) {\n      index_1 ("0.0050, 0.0100");\n'
+                    '      values ("0.10, 0.20");\n    }\n  }\n}\n')
+        plain = LibertyParser(self.lib_path).parse()
+        numeric = LibertyParser(self.lib_path, cache_dir=self.cache, numeric_tables=True).parse()
+        assert numeric.get(cell='A', t='s').index_1.tolist() == [0.005, 0.01]
+        assert self.cache.load(self.lib_path) == plain
+        assert LibertyParser(self.lib_path, cache_dir=self.cache).parse() == plain
+        assert LibertyParser(self.lib_path, cache_dir=self.cache, numeric_tables=True).parse().dump() == numeric.dump()
+
+    def test_deep_tree(self):
+        depth = 3000
+        with open(self.lib_path, 'w') as f:
+            f.write("library (deep) {\n" + "group (g) {\n" * depth + "a : 1;\n" + "}\n" * (depth + 1))
+        text = LibertyParser(self.lib_path, cache_dir=self.cache).parse().dump(indent_separator='')
+        assert self.cache.load(self.lib_path).dump(indent_separator='') == text
+        assert LibertyParser(self.lib_path, cache_dir=self.cache).parse().dump(indent_separator='') == text
+
+    def test_store_failure(self):
+        with mock.patch.object(ParseCache, 'store', side_effect=OSError("No space left on device")):
+            assert LibertyParser(self.lib_path, cache_dir=self.cache).parse() == self.library
+        assert self.cache.load(self.lib_path) is None
+
+    def test_encoding(self):
+        LibertyParser(self.lib_path, cache_dir=self.cache).parse()
+        assert self.cache.load(self.lib_path, encoding='latin-1') is None
+        assert self.cache.load(self.lib_path) == self.library
+
+    def test_evict(self):
+        cache = ParseCache(f"{TEST_DIR}/cache", max_entries=1)
+        other_path = f"{TEST_DIR}/other.lib"
+        shutil.copy(TEST_LIB, other_path)
+
+        LibertyParser(self.lib_path, cache_dir=cache).parse()
+        os.utime(cache._entry(self.lib_path)[0], (0, 0))  # Least recently used
+        LibertyParser(other_path, cache_dir=cache).parse()
+        assert cache.load(self.lib_path) is None
+        assert cache.load(other_path) == self.library
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,14 @@
+import gc
+import weakref
 import os
 import json
+import types
 import unittest
 from liberty_sdk.tools.logger import setup_logger
-from liberty_sdk.parser.liberty_parser import LibertyParser, LibertyJSONEncoder, LibertyGroup
+from liberty_sdk.tools.synthetic import write_synthetic_library
+from liberty_sdk.parser.query_cache import query_cache
+from liberty_sdk.parser.liberty_parser import LibertyParser, LibertyJSONEncoder, LibertyGroup, LibertyHandler, \
+    GroupFilter, LibertyAttribute
 
 logger = setup_logger(log_file="unittest.log")
 
@@ -32,9 +38,225 @@ class ParserTestCase(unittest.TestCase):
         with open(f"{TEST_DIR}/parsed_lib.lib", 'w') as f:
             f.write(self.library.dump(indent_value=True, indent_separator=' '))
 
+    def test_streaming_tokens(self):
+        tokens = LibertyParser(TEST_LIB)._tokenize()
+        assert isinstance(tokens, types.GeneratorType)
+        first = next(tokens)
+        assert (first.value, first.line) == ('library', 1)
+
+    def test_tree_matches_reference_json(self):
+        with open('test/test_cell.json') as f:
+            reference = json.load(f)
+        assert json.loads(json.dumps(self.library, cls=LibertyJSONEncoder)) == reference
+
+    def test_iterative_matches_recursive(self):
+        recursive = LibertyParser(TEST_LIB, iterative=False).parse()
+        assert recursive == self.library
+
+    def test_deep_nesting_and_long_values(self):
+        if not os.path.exists(TEST_DIR):
+            os.makedirs(TEST_DIR)
+
+        depth, width = 3000, 5000
+        lib_path = f"{TEST_DIR}/deep_lib.lib"
+        with open(lib_path, 'w') as f:
+            f.write("library(deep) {\n")
+            f.write("group(g) {\n" * depth)
+            f.write("values (" + ", ".join(f'"{i}"' for i in range(width)) + ");\n")
+            f.write("}\n" * depth)
+            f.write("}\n")
+
+        library = LibertyParser(lib_path).parse()
+        group = library
+        for _ in range(depth):
+            group = group.children[0]
+        assert group.children[0].params == [str(i) for i in range(width)]
+
+        # Converted without recursion
+        data = library.asdict()
+        for _ in range(depth):
+            data = data['group'][0]
+        assert data['values'] == [str(i) for i in range(width)]
+
+        # Dumped without recursion, unindented as indentation alone is quadratic in depth
+        out_path = f"{TEST_DIR}/deep_lib_out.lib"
+        with open(out_path, 'w') as f:
+            written = library.dump_to(f, indent_separator='', buffer_size=4096)
+        with open(out_path) as f:
+            text = f.read()
+        assert written == len(text)
+        assert text == library.dump(indent_separator='')
+        assert LibertyParser(out_path).parse().dump(indent_separator='') == text
+
+    def test_parse_events(self):
+        class CellHandler(LibertyHandler):
+            def __init__(self):
+                self.path, self.area, self.voltage_map = [], {}, []
+
+            def start_group(self, group_type, name):
+                self.path.append((group_type, name))
+
+            def end_group(self):
+                self.path.pop()
+
+            def attribute(self, name, value):
+                if name == 'area' and self.path[-1][0] == 'cell':
+                    self.area[self.path[-1][1]] = value
+
+            def complex_attribute(self, name, params):
+                if name == 'voltage_map':
+                    self.voltage_map.append(params)
+
+        handler = LibertyParser(TEST_LIB).parse_events(CellHandler())
+        assert handler.path == []
+        assert handler.area == {'AND2': '1', 'NAND2': '1'}
+        assert handler.voltage_map == [['VDD', '0.75'], ['VSS', '0'], ['GND', '0']]
+
+    def test_group_filter(self):
+        for iterative in (True, False):
+            library = LibertyParser(TEST_LIB, iterative=iterative, group_filter=GroupFilter(cells='NAND*')).parse()
+            cells = [g.name for g in library.children if isinstance(g, LibertyGroup) and g.group_type == 'cell']
+            assert cells == ['NAND2']
+            assert library.get(cell='NAND2', pin='o') == self.library.get(cell='NAND2', pin='o')
+            assert library.get('voltage_map') == self.library.get('voltage_map')
+
+        library = LibertyParser(TEST_LIB, group_filter=GroupFilter(group_types=['cell', 'pin'])).parse()
+        pin = library.get(cell='AND2', pin='o')
+        assert pin.params == self.library.get(cell='AND2', pin='o').params
+        assert pin.children == []
+        assert library.get(lu_table_template='delay_temp_3x3') is library
+
+    def test_comments_and_continuation(self):
+        text = '''library(x) {
+  /* multi-line
+     comment { */
+  comment : "http://x.org {"; // trailing comment
+  values ("1, 2", \\
+          "3, 4");
+  cell (A) { area : 1; pin (p) { direction : input; } }
+  cell (B) { area : 2; }
+}'''
+        library = LibertyParser.from_string(text).parse()
+        assert library.params == {'comment': '"http://x.org {"'}
+        assert library.get('values') == ['1, 2', '3, 4']
+
+        library = LibertyParser.from_string(text, group_filter=GroupFilter(cells='B')).parse()
+        assert [child.name for child in library.children[1:]] == ['B']
+
+        with self.assertRaisesRegex(Exception, 'Line 8'):
+            LibertyParser.from_string(text.replace('area : 2', 'area 2')).parse()
+
+    def test_query_cache(self):
+        query_cache.clear()
+        pin = self.library.get(cell='AND2', pin='o')
+        assert self.library.get(cell='AND2', pin='o') is pin
+        assert query_cache.stats()['hits'] == 1
+
+        # Nodes are cached, their values are read on every lookup
+        cell = self.library.get(cell='AND2')
+        assert cell.get('area') == '1'
+        cell.set_params(area='2')
+        assert cell.get('area') == '2'
+        cell.params['area'] = '3'
+        assert cell.asdict()['area'] == '3'
+        tree = LibertyGroup('library', 'z', children=[LibertyAttribute('comment', '"a"')])
+        assert tree.get(comment='') == '"a"'
+        tree.children[0].value = '"b"'
+        assert tree.get(comment='') == '"b"'
+
+        # Editing another tree keeps entries
+        LibertyGroup('library', 'y').set_child(LibertyGroup('cell', 'A'))
+        assert self.library.get(cell='AND2', pin='o') is pin
+        assert query_cache.stats()['hits'] == 3
+
+        # Misses and the node itself are not cached, so the tree is released
+        pin = self.library.get(cell='AND2', pin='o')
+        assert self.library.get(cell='MISSING') is self.library
+        assert pin.get() is pin
+        assert len(query_cache) == 3
+        library = weakref.ref(self.library)
+        del self.library, cell, pin, tree
+        gc.collect()
+        assert library() is None
+        assert len(query_cache) == 0
+
+        # Partial matches are not cached, so children appended directly are found
+        group = LibertyGroup('library', 'x', children=[LibertyGroup('cell', 'A')])
+        assert group.get(cell='A', pin='Z') is group.children[0]
+        group.children[0].children.append(LibertyGroup('pin', 'Z'))
+        assert group.get(cell='A', pin='Z').name == 'Z'
+
+    def test_indexed_lookup(self):
+        library = LibertyGroup('library', 'big')
+        for i in range(2000):
+            cell = LibertyGroup('cell', f'C{i}')
+            cell.set_params(area=str(i))
+            library.set_child(cell)
+        assert library.get(cell='C1500').get('area') == '1500'
+        assert library.get(cell='C0') is library.children[0]
+
+        # Updated by set_child, and by direct append
+        library.set_child(LibertyGroup('cell', 'NEW'))
+        library.children.append(LibertyGroup('pin', 'P'))
+        assert library.get(cell='NEW').name == 'NEW'
+        assert library.get(pin='P').name == 'P'
+        assert library.get(cell='MISSING') is library
+        assert len(library.get('cell')) == 2001
+
+    def test_indexed_lookup_edited(self):
+        cell = LibertyGroup('cell', 'A', children=[LibertyGroup('pin', 'A'), LibertyGroup('pin', 'B')])
+        library = LibertyGroup('library', 'x', children=[cell])
+        assert library.get(cell='A', pin='A').name == 'A'
+        assert [pin.name for pin in library.select('cell/pin')] == ['A', 'B']
+
+        # Replaced in place, same length
+        cell.children[0] = LibertyGroup('pin', 'Z')
+        assert library.get(cell='A', pin='Z') is cell.children[0]
+        assert library.get(cell='A', pin='A') is cell
+        assert [pin.name for pin in library.select('cell/pin')] == ['Z', 'B']
+
+        # Replaced by a node of the same key, found instead of the cached one
+        cell.children[0] = LibertyGroup('pin', 'Z', params={'direction': 'output'})
+        assert library.get(cell='A', pin='Z').params == {'direction': 'output'}
+
+        # Removed, then appended
+        del cell.children[0]
+        cell.children.append(LibertyGroup('pin', 'C'))
+        assert cell.find_child('pin', 'B') is cell.children[0]
+        assert cell.find_child('pin', 'C') is cell.children[1]
+        assert cell.find_child('pin', 'Z') is None
+        assert library.get(cell='A', pin='B') is cell.children[0]
+        assert [pin.name for pin in cell.get('pin')] == ['B', 'C']
+
+    def test_shared_containers(self):
+        params, children = {}, []
+        group = LibertyGroup('cell', 'A', params, children)
+        params['area'] = '1'
+        children.append(LibertyGroup('pin', 'Z'))
+        assert group.params is params and group.children is children
+        assert group.get(pin='Z').name == 'Z' and group.get('area') == '1'
+        assert LibertyGroup('cell', 'B')._children is None
+
     def test_parse_large_file(self):
-        # TODO
-        pass
+        if not os.path.exists(TEST_DIR):
+            os.makedirs(TEST_DIR)
+
+        cells = 100
+        lib_path = f"{TEST_DIR}/synthetic.lib"
+        write_synthetic_library(lib_path, cells=cells, inputs=3, buses=1, bus_width=8, table_size=(5, 6))
+        library = LibertyParser(lib_path).parse()
+
+        assert len(library.get('cell')) == cells
+        pin = library.get(cell=f"CELL_{cells - 1}", bus='ADR', pin='ADR[7]')
+        assert pin.name == 'ADR[7]'
+        timing = library.get(cell='CELL_7', pin='Z', timing="")
+        assert timing.get('related_pin') == '"A"'
+        values = timing.get(cell_rise='delay_template_5x6').get('values')
+        assert len(values) == 5 and all(row.count(',') == 5 for row in values)
+
+        with open(f"{TEST_DIR}/synthetic_out.lib", 'w') as f:
+            library.dump_to(f)
+        assert LibertyParser(f"{TEST_DIR}/synthetic_out.lib").parse() == library
 
     def test_get_values(self):
         # Test Simple Attribute
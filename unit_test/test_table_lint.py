@@ -0,0 +1,105 @@
+import os
+import unittest
+from liberty_sdk.tools.logger import setup_logger
+from liberty_sdk.parser.liberty_linter import LibertyLinter
+
+try:
+    import numpy as np
+    from liberty_sdk.parser.table_lint import TABLE_RULES
+except ImportError:
+    np = None
+
+logger = setup_logger(log_file="unittest.log")
+
+TEST_LIB = 'test/test_cell.lib'
+TEST_DIR = 'tmp'
+
+TABLE = """            {group_type} ({template}) {{
+                values ({values});
+            }}
+"""
+
+LIB_TEXT = """library (tables) {{
+    lu_table_template (delay_3x3) {{
+        variable_1 : input_net_transition;
+        variable_2 : total_output_net_capacitance;
+        index_1 ("0.1, 0.2, 0.4");
+        index_2 ("0.01, 0.02, 0.04");
+    }}
+    power_lut_template (power_3) {{
+        variable_1 : input_transition_time;
+        index_1 ("0.1, 0.4, 0.2");
+    }}
+    cell (INV) {{
+        pin (Z) {{
+            timing () {{
+                related_pin : "A";
+{tables}            }}
+        }}
+    }}
+}}
+"""
+
+GOOD = '"0.1, 0.2, 0.3", "0.2, 0.3, 0.4", "0.3, 0.4, 0.5"'
+
+
+def table(group_type, values, template='delay_3x3'):
+    return TABLE.format(group_type=group_type, template=template, values=values)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TableLintTestCase(unittest.TestCase):
+    def lint(self, tables):
+        os.makedirs(TEST_DIR, exist_ok=True)
+        file_path = os.path.join(TEST_DIR, 'tables.lib')
+        with open(file_path, 'w') as f:
+            f.write(LIB_TEXT.format(tables=''.join(tables)))
+        linter = LibertyLinter(file_path, rules=TABLE_RULES)
+        linter.run_checks()
+        return [(d['code'], d['location']['start_line']) for d in linter.diagnostics], linter
+
+    def test_clean(self):
+        codes, _ = self.lint([table('cell_rise', GOOD), table('rise_transition', GOOD)])
+        assert codes == [('E507', 8)]  # power_3 index_1
+        linter = LibertyLinter(TEST_LIB, rules=TABLE_RULES)
+        assert linter.run_checks() and not linter.warnings
+
+    def test_problems(self):
+        codes, linter = self.lint([
+            table('cell_rise', '"0.1, 0.2, 0.3", "0.2, 0.3, 0.4"'),  # 2 rows for 3
+            table('cell_fall', '"0.1, 0.2, 0.3", "0.2, nan, 0.4", "0.3, 0.4, 0.5"'),
+            table('rise_transition', '"0.1, 0.2, 0.3", "0.2, -0.3, 0.4", "0.3, 0.4, 0.5"'),
+            table('fall_transition', '"0.1, 0.2, 0.3", "0.2, 0.1, 0.4", "0.3, 0.4, 0.5"'),
+            table('cell_rise', '"0.1, 0.2, 0.3", "0.2, 2.3, 0.4", "0.3, 0.4, 0.5"'),
+            table('cell_rise', GOOD, template='delay_9x9'),
+            table('rise_power', '"0.1, -0.2, 0.3"', template='power_3'),
+        ])
+        assert ('E501', 16) in codes
+        assert ('E503', 19) in codes
+        assert ('E504', 22) in codes
+        assert ('W505', 25) in codes  # 0.2 -> 0.1 along load
+        assert ('W506', 28) in codes  # 2.3
+        assert ('W506', 22) in codes  # -0.3 is a spike as well
+        assert ('W502', 31) in codes
+        assert ('W504', 34) in codes
+        assert ('W505', 28) in codes  # after the spike
+        spike = [d for d in linter.warnings if d['code'] == 'W506' and d['location']['start_line'] == 28][0]
+        assert spike['message'] == ('cell (INV)/pin (Z)/timing (related_pin="A")/cell_rise (delay_3x3): '
+                                    'spike of 2.3 at (1, 1)')
+
+    def test_batch(self):
+        rng = np.random.default_rng(0)
+        tables = []
+        for i in range(200):
+            values = np.sort(rng.uniform(0.1, 1.0, 9)).reshape(3, 3)
+            if i == 150:
+                values[2, 1] = -1
+            rows = ', '.join(f'"{", ".join(map(repr, row.tolist()))}"' for row in values)
+            tables.append(table('cell_rise', rows))
+        codes, _ = self.lint(tables)
+        assert ('E504', 13 + 3 * 150 + 3) in codes
+        assert all(line == 13 + 3 * 150 + 3 for code, line in codes if code != 'E507')
+
+
+if __name__ == '__main__':
+    unittest.main()